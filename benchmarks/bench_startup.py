@@ -0,0 +1,71 @@
+"""Measures cold-start time to the login page and checks that heavy libraries stay unloaded.
+
+Each sample runs in a fresh interpreter, importing main_app and rendering the
+login page (Streamlit bare mode). The "eager" variant imports pandas, numpy and
+PIL first, reproducing the old module-top imports, so the difference is the
+time the lazy imports save on every cold start.
+
+    python -m benchmarks.bench_startup --runs 7 --output benchmarks/baselines/startup.json
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+HEAVY_MODULES = ("pandas", "numpy", "PIL")
+
+_PROBE = """
+import json, sys, time
+start = time.perf_counter()
+if {eager}:
+    import numpy, pandas, PIL.Image
+import streamlit.logger
+streamlit.logger.set_log_level("error")
+import main_app
+main_app.run_app()
+elapsed = time.perf_counter() - start
+print(json.dumps({{"seconds": elapsed, "loaded": [m for m in {heavy!r} if m in sys.modules]}}))
+"""
+
+
+def sample(eager):
+    """Runs one cold start in a fresh interpreter; returns (seconds, heavy modules loaded)."""
+    code = _PROBE.format(eager=eager, heavy=HEAVY_MODULES)
+    completed = subprocess.run([sys.executable, "-c", code], cwd=REPO_ROOT, capture_output=True, text=True, check=True)
+    result = json.loads(completed.stdout.strip().splitlines()[-1])
+    return result["seconds"], result["loaded"]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5, help="cold starts per variant (default: 5)")
+    parser.add_argument("--output", default=None, help="optional JSON file for the results")
+    args = parser.parse_args(argv)
+
+    results = {}
+    for variant, eager in (("lazy", False), ("eager", True)):
+        timings, loaded = [], []
+        for _ in range(args.runs):
+            seconds, loaded = sample(eager)
+            timings.append(seconds)
+        results[variant] = {"seconds_min": min(timings), "seconds_median": statistics.median(timings), "runs": args.runs, "heavy_modules_loaded": loaded}
+        print(f"{variant:<6} login page cold start  min {min(timings):.3f}s  median {statistics.median(timings):.3f}s  heavy modules loaded: {', '.join(loaded) or 'none'}")
+
+    saved = results["eager"]["seconds_median"] - results["lazy"]["seconds_median"]
+    results["saved_seconds_median"] = saved
+    print(f"Lazy imports save {saved:.3f}s per cold start ({saved / results['eager']['seconds_median']:.0%}).")
+
+    if args.output:
+        os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+        with open(args.output, "w", encoding="utf-8") as fh:
+            json.dump(results, fh, indent=2)
+
+    # The login page must never pull in the heavy libraries
+    return 1 if results["lazy"]["heavy_modules_loaded"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,193 @@
+"""Simulates N concurrent users running the heavy transforms, in-process and through the worker service.
+
+Streamlit serves every session from a thread of one process, so each simulated
+user is a thread that repeatedly generates SKU listings and optimizes images.
+"inprocess" runs the transforms on those threads, as a single Streamlit
+process does without a worker; "worker" sends them to worker_service.py. A
+probe thread meanwhile measures how late a 10 ms sleep wakes up, which is how
+long any other session's script would stall behind the heavy work.
+
+    python -m benchmarks.load_test --users 8 --rows 2000 --images 4
+    python -m benchmarks.load_test --users 16 --mode worker --address 127.0.0.1:6100
+
+Without --address a temporary worker service (and result store) is started
+for the worker mode. --shared-inputs gives every user the same upload, which
+shows results computed for one user being reused by the others.
+"""
+import argparse
+import io
+import json
+import os
+import pickle
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+import streamlit.logger
+
+# synthetic_data imports main_app, which only warns about the missing script context outside `streamlit run`
+streamlit.logger.set_log_level("error")
+
+from PIL import Image
+
+import worker_service
+from benchmarks.synthetic_data import make_image_set, make_listing_frame
+from result_store import ResultStore
+from transforms import expand_variations, fill_missing_descriptions, optimize_image
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PROBE_INTERVAL = 0.01               # seconds the stall probe sleeps between wake-ups
+WORKER_START_TIMEOUT = 30
+
+
+# =========================================================================
+# SIMULATED USER WORKLOAD
+# =========================================================================
+def make_user_inputs(user, rows, images, shared_inputs):
+    """One user's upload: a pickled listing frame and a list of image bytes."""
+    seed = 0 if shared_inputs else user
+    listing = pickle.dumps(make_listing_frame(rows, seed=seed), protocol=pickle.HIGHEST_PROTOCOL)
+    image_bytes = [image.getvalue() for image in make_image_set(images, seed=seed)]
+    return listing, image_bytes
+
+
+def run_inprocess(task, params, data):
+    if task == "listing_transform":
+        df = pickle.loads(data)
+        return pickle.dumps(expand_variations(fill_missing_descriptions(df)), protocol=pickle.HIGHEST_PROTOCOL), False
+    with Image.open(io.BytesIO(data)) as image:
+        optimized_image, jpeg_output = optimize_image(image, params["max_width"], params["quality"])
+        optimized_image.close()
+        with jpeg_output:
+            return jpeg_output.read(), False
+
+
+def simulate_user(user_inputs, iterations, execute, latencies, hits, errors):
+    listing, image_bytes = user_inputs
+    jobs = [("listing_transform", {}, listing)] + [("optimize_image", {"max_width": 1000, "quality": 85}, data) for data in image_bytes]
+    for _ in range(iterations):
+        for task, params, data in jobs:
+            start = time.perf_counter()
+            try:
+                _, cached = execute(task, params, data)
+            except Exception as e:
+                errors.append(f"{task}: {e}")
+                continue
+            latencies.setdefault(task, []).append(time.perf_counter() - start)
+            hits.append(cached)
+
+
+def stall_probe(stop, lateness):
+    """Records how much later than PROBE_INTERVAL this thread gets to run again."""
+    while not stop.is_set():
+        start = time.perf_counter()
+        time.sleep(PROBE_INTERVAL)
+        lateness.append(time.perf_counter() - start - PROBE_INTERVAL)
+
+
+def _percentile(values, pct):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(round(pct / 100 * (len(values) - 1))))] if values else None
+
+
+def run_load(inputs, iterations, execute):
+    """Runs every user on its own thread; returns throughput, latency and stall statistics."""
+    latencies, hits, errors, lateness = {}, [], [], []
+    stop = threading.Event()
+    probe = threading.Thread(target=stall_probe, args=(stop, lateness), daemon=True)
+    users = [threading.Thread(target=simulate_user, args=(user_inputs, iterations, execute, latencies, hits, errors)) for user_inputs in inputs]
+    probe.start()
+    start = time.perf_counter()
+    for thread in users:
+        thread.start()
+    for thread in users:
+        thread.join()
+    wall = time.perf_counter() - start
+    stop.set()
+    probe.join()
+    return {
+        "users": len(inputs),
+        "wall_seconds": round(wall, 3),
+        "jobs": len(hits),
+        "jobs_per_second": round(len(hits) / wall, 2),
+        "cache_hits": sum(hits),
+        "errors": errors[:10],
+        "latency_ms": {task: {"p50": round(_percentile(v, 50) * 1000, 1), "p95": round(_percentile(v, 95) * 1000, 1)} for task, v in latencies.items()},
+        "stall_ms": {"p95": round(_percentile(lateness, 95) * 1000, 1), "max": round(max(lateness) * 1000, 1)} if lateness else None,
+    }
+
+
+# =========================================================================
+# WORKER SERVICE
+# =========================================================================
+def start_worker(address, store_root, processes):
+    """Starts worker_service.py in a subprocess and waits until it answers."""
+    command = [sys.executable, os.path.join(REPO_ROOT, "worker_service.py"), "--address", address, "--store", store_root]
+    if processes:
+        command += ["--processes", str(processes)]
+    process = subprocess.Popen(command, cwd=REPO_ROOT, stdout=subprocess.DEVNULL)
+    deadline = time.time() + WORKER_START_TIMEOUT
+    while not worker_service.ping(address, store_root=store_root):
+        if process.poll() is not None or time.time() > deadline:
+            process.kill()
+            raise RuntimeError("Worker service did not start.")
+        time.sleep(0.2)
+    return process
+
+
+def print_result(mode, result):
+    latency = "  ".join(f"{task} p50 {v['p50']:.0f}ms p95 {v['p95']:.0f}ms" for task, v in result["latency_ms"].items())
+    stall = result["stall_ms"] or {"p95": 0, "max": 0}
+    print(f"{mode:<10} {result['users']:>3} users  {result['wall_seconds']:>7.2f}s  {result['jobs_per_second']:>6.2f} jobs/s  "
+          f"cache hits {result['cache_hits']:>3}  stall p95 {stall['p95']:.0f}ms max {stall['max']:.0f}ms  {latency}", flush=True)
+    for error in result["errors"]:
+        print(f"  error: {error}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=8, help="concurrent users (default: 8)")
+    parser.add_argument("--iterations", type=int, default=1, help="times each user repeats its jobs (default: 1)")
+    parser.add_argument("--rows", type=int, default=2_000, help="base products per listing upload (default: 2000)")
+    parser.add_argument("--images", type=int, default=4, help="images optimized per user and iteration (default: 4)")
+    parser.add_argument("--mode", choices=("inprocess", "worker", "both"), default="both")
+    parser.add_argument("--address", default=None, help="existing worker service to use instead of starting one")
+    parser.add_argument("--processes", type=int, default=None, help="pool size for the worker started here (default: CPU count)")
+    parser.add_argument("--shared-inputs", action="store_true", help="give every user the same upload")
+    parser.add_argument("--output", default=None, help="optional JSON file for the results")
+    args = parser.parse_args(argv)
+
+    inputs = [make_user_inputs(user, args.rows, args.images, args.shared_inputs) for user in range(args.users)]
+    results = {}
+    if args.mode in ("inprocess", "both"):
+        results["inprocess"] = run_load(inputs, args.iterations, run_inprocess)
+        print_result("inprocess", results["inprocess"])
+
+    if args.mode in ("worker", "both"):
+        with tempfile.TemporaryDirectory(prefix="ecom-load-") as tmp:
+            worker = None
+            if args.address:
+                address, store = args.address, ResultStore()
+            else:
+                address, store = os.path.join(tmp, "worker.sock"), ResultStore(os.path.join(tmp, "store"))
+                worker = start_worker(address, store.root, args.processes)
+            try:
+                execute = lambda task, params, data: worker_service.run_task(task, params, data, address=address, store=store)
+                results["worker"] = run_load(inputs, args.iterations, execute)
+                print_result("worker", results["worker"])
+            finally:
+                if worker is not None:
+                    worker.terminate()
+                    worker.wait()
+
+    if args.output:
+        os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+        with open(args.output, "w", encoding="utf-8") as fh:
+            json.dump({"args": vars(args), "results": results}, fh, indent=2)
+    return 1 if any(result["errors"] for result in results.values()) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
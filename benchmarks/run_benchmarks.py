@@ -0,0 +1,212 @@
+"""Times and memory-profiles the main_app data paths and saves JSON baselines.
+
+Run from the repository root:
+
+    python -m benchmarks.run_benchmarks                       # 1k/100k/1M rows, saves benchmarks/baselines/<commit>.json
+    python -m benchmarks.run_benchmarks --sizes 1000,100000 --compare benchmarks/baselines/<older>.json
+"""
+import argparse
+import gc
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+import PIL
+import streamlit.logger
+from PIL import Image
+
+# main_app imports streamlit; outside `streamlit run` it only warns about the missing script context
+streamlit.logger.set_log_level("error")
+
+import main_app
+import perf_monitor
+from download_output import dataframe_to_csv_output
+from listing_diff import diff_exports
+from transforms import expand_variations, fill_missing_descriptions, generate_description_mock, optimize_image
+from benchmarks.synthetic_data import make_flipkart_frame, make_image_set, make_listing_frame, make_previous_export
+
+# =========================================================================
+# CONFIGURATION
+# =========================================================================
+DEFAULT_ROW_SIZES = [1_000, 100_000, 1_000_000]
+DEFAULT_IMAGE_COUNTS = [10, 100]
+BASELINE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baselines")
+REGRESSION_THRESHOLD = 0.10     # 10% slower (or larger peak memory) counts as a regression
+
+
+# =========================================================================
+# BENCHMARK DEFINITIONS
+# =========================================================================
+# Each benchmark is (prepare(size) -> state, run(state)); only run() is measured.
+def _prepare_listings(n_rows):
+    return make_listing_frame(n_rows)
+
+def _run_generate_sku_listings(df):
+    # The transforms themselves: main_app.generate_sku_listings hands them to the worker service when ECOM_WORKER_ADDRESS is set
+    return expand_variations(fill_missing_descriptions(df.copy()))
+
+def _run_generate_description_mock(df):
+    return df.apply(generate_description_mock, axis=1)
+
+def _run_csv_export(df):
+    dataframe_to_csv_output(df).close()
+
+def _prepare_flipkart(n_rows):
+    return make_flipkart_frame(n_rows)
+
+def _run_repricing(df):
+    return main_app.apply_bank_settlement_increase(df.copy(), 100.0, 500.0, 5)
+
+def _prepare_export_diff(n_rows):
+    current = make_flipkart_frame(n_rows)
+    return make_previous_export(current), current
+
+def _run_export_diff(state):
+    previous, current = state
+    return diff_exports(previous, current, key='Seller SKU Id')
+
+def _prepare_images(n_images):
+    return make_image_set(n_images)
+
+def _run_image_optimization(image_files):
+    for image_file in image_files:
+        image_file.seek(0)
+        with Image.open(image_file) as image:
+            optimize_image(image, 1000, 85)
+
+ROW_BENCHMARKS = {
+    "generate_sku_listings": (_prepare_listings, _run_generate_sku_listings),
+    "generate_description_mock": (_prepare_listings, _run_generate_description_mock),
+    "repricing": (_prepare_flipkart, _run_repricing),
+    "csv_export": (_prepare_listings, _run_csv_export),
+    "export_diff": (_prepare_export_diff, _run_export_diff),
+}
+IMAGE_BENCHMARKS = {
+    "image_optimization": (_prepare_images, _run_image_optimization),
+}
+
+
+# =========================================================================
+# MEASUREMENT
+# =========================================================================
+def measure(prepare, run, size, repeat):
+    """Returns wall-time statistics and traced peak memory for run(prepare(size))."""
+    state = prepare(size)
+    timings = []
+    for _ in range(repeat):
+        gc.collect()
+        start = time.perf_counter()
+        run(state)
+        timings.append(time.perf_counter() - start)
+    # Memory is traced in a separate pass so tracemalloc overhead does not skew the timings
+    gc.collect()
+    tracemalloc.start()
+    run(state)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {
+        "seconds_min": min(timings),
+        "seconds_median": statistics.median(timings),
+        "repeat": repeat,
+        "peak_memory_mb": round(peak / (1024 * 1024), 2),
+    }
+
+
+def default_repeat(size):
+    return 5 if size <= 10_000 else (3 if size <= 100_000 else 1)
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def run_suite(row_sizes, image_counts, selected=None, repeat=None):
+    results = {}
+    suites = [(ROW_BENCHMARKS, row_sizes), (IMAGE_BENCHMARKS, image_counts)]
+    for benchmarks, sizes in suites:
+        for name, (prepare, run) in benchmarks.items():
+            if selected and name not in selected:
+                continue
+            for size in sizes:
+                stats = measure(prepare, run, size, repeat or default_repeat(size))
+                results.setdefault(name, {})[str(size)] = stats
+                print(f"{name:<28} {size:>10,}  {stats['seconds_min']:>9.3f}s  {stats['peak_memory_mb']:>9.1f} MB", flush=True)
+    return {
+        "meta": {
+            "commit": git_commit(),
+            "created_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "pandas": pd.__version__,
+            "numpy": np.__version__,
+            "pillow": PIL.__version__,
+            "machine": platform.machine(),
+            "cpu_count": os.cpu_count(),
+        },
+        "results": results,
+    }
+
+
+def compare(current, baseline, threshold=REGRESSION_THRESHOLD):
+    """Prints per-benchmark deltas against a baseline; returns the list of regressions."""
+    regressions = []
+    print(f"\nComparison against baseline {baseline['meta'].get('commit')} ({baseline['meta'].get('created_at')}):")
+    for name, by_size in current["results"].items():
+        for size, stats in by_size.items():
+            base = baseline.get("results", {}).get(name, {}).get(size)
+            if not base:
+                continue
+            time_delta = stats["seconds_min"] / base["seconds_min"] - 1 if base["seconds_min"] else 0.0
+            memory_delta = stats["peak_memory_mb"] / base["peak_memory_mb"] - 1 if base["peak_memory_mb"] else 0.0
+            flag = ""
+            if time_delta > threshold or memory_delta > threshold:
+                flag = "  REGRESSION"
+                regressions.append((name, size))
+            print(f"{name:<28} {int(size):>10,}  time {time_delta:+7.1%}  memory {memory_delta:+7.1%}{flag}")
+    return regressions
+
+
+def _parse_sizes(value):
+    return [int(float(v)) for v in value.split(",") if v.strip()]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=_parse_sizes, default=DEFAULT_ROW_SIZES, help="comma separated row counts (default: 1000,100000,1000000)")
+    parser.add_argument("--image-counts", type=_parse_sizes, default=DEFAULT_IMAGE_COUNTS, help="comma separated image set sizes (default: 10,100)")
+    parser.add_argument("--only", type=lambda v: set(v.split(",")), default=None, help=f"subset of: {', '.join([*ROW_BENCHMARKS, *IMAGE_BENCHMARKS])}")
+    parser.add_argument("--repeat", type=int, default=None, help="timed runs per size (default: 5/3/1 by size)")
+    parser.add_argument("--output", default=None, help="baseline JSON to write (default: benchmarks/baselines/<commit>.json)")
+    parser.add_argument("--compare", default=None, help="baseline JSON to compare against; exits 1 on regression")
+    parser.add_argument("--threshold", type=float, default=REGRESSION_THRESHOLD, help="relative slowdown treated as a regression (default: 0.10)")
+    args = parser.parse_args(argv)
+
+    # Keep benchmark runs out of the app's performance log
+    perf_monitor.set_enabled(False)
+    current = run_suite(args.sizes, args.image_counts, selected=args.only, repeat=args.repeat)
+
+    output = args.output or os.path.join(BASELINE_DIR, f"{current['meta']['commit']}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w", encoding="utf-8") as fh:
+        json.dump(current, fh, indent=2)
+    print(f"\nSaved results to {output}")
+
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as fh:
+            baseline = json.load(fh)
+        if compare(current, baseline, args.threshold):
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
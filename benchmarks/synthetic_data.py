@@ -0,0 +1,127 @@
+"""Synthetic inputs for the benchmark suite, shaped like real uploads."""
+import io
+
+import numpy as np
+import pandas as pd
+from PIL import Image
+
+from main_app import SAMPLE_CSV_HEADERS
+
+# =========================================================================
+# VALUE POOLS (Modeled on the Ecommerce sample template)
+# =========================================================================
+PRODUCT_TYPES = ["Tee", "Polo", "Shirt", "Kurta", "Hoodie", "Joggers", "Shorts", "Track Pants", "Jacket", "Sweatshirt"]
+ADJECTIVES = ["Premium", "Classic", "Slim Fit", "Oversized", "Everyday", "Athleisure", "Heritage", "Urban"]
+COLORS = ["Red", "Navy Blue", "Black", "White", "Olive Green", "Maroon", "Sky Blue", "Charcoal Grey", "Mustard", "Beige"]
+FABRICS = ["Cotton", "Cotton Blend", "Polyester", "Linen", "Viscose", "Lycra", "Fleece"]
+BRANDS = ["Formula Man", "Globalite", "Urban Edge", "Desi Threads", "Northline"]
+CATEGORIES = ["T-Shirt", "Shirt", "Kurta", "Hoodie", "Joggers", "Shorts", "Jacket"]
+VARIATIONS = ["S,M,L", "S,M,L,XL", "M,L,XL,XXL", "XS,S,M", "Free Size", "28,30,32,34", "S, M, L, XL, XXL"]
+HSN_CODES = [6105, 6109, 6110, 6203, 6204, 6211]
+GST_RATES = [5, 12, 18]
+
+
+def _pick(rng, pool, n_rows):
+    return np.asarray(pool, dtype=object)[rng.integers(0, len(pool), n_rows)]
+
+
+def make_listing_frame(n_rows, seed=0, described_share=0.1):
+    """Builds a Listing Maker upload with n_rows base products and SAMPLE_CSV_HEADERS columns.
+
+    Only described_share of rows carry a description, so the rest exercise
+    generate_description_mock as real uploads do.
+    """
+    rng = np.random.default_rng(seed)
+    colors = _pick(rng, COLORS, n_rows)
+    product_type = _pick(rng, PRODUCT_TYPES, n_rows)
+    index = pd.Series(np.arange(n_rows)).astype(str).str.zfill(7)
+    mrp = rng.integers(4, 40, n_rows) * 100 - 1
+    image_ids = pd.Series(rng.integers(0, max(n_rows // 3, 1), n_rows)).astype(str)
+    image_base = "https://cdn.example.com/catalog/" + image_ids
+    descriptions = np.where(rng.random(n_rows) < described_share, "Hand-written description kept as uploaded.", "")
+    data = {
+        'Product Name*': pd.Series(_pick(rng, ADJECTIVES, n_rows)) + " " + pd.Series(_pick(rng, FABRICS, n_rows)) + " " + pd.Series(product_type),
+        'Variations (comma separated)*': _pick(rng, VARIATIONS, n_rows),
+        'Product Color*': colors,
+        'Group Name*': "G_" + pd.Series(product_type).str.upper().str.replace(" ", "_") + "_" + pd.Series(colors).str.upper().str.replace(" ", ""),
+        'Fabric Type*': _pick(rng, FABRICS, n_rows),
+        'SKU Code*': "SKU-" + index,
+        'MRP*': mrp,
+        'Selling Price*': (mrp * rng.uniform(0.4, 0.9, n_rows)).astype(int),
+        'Brand*': _pick(rng, BRANDS, n_rows),
+        'HSN*': _pick(rng, HSN_CODES, n_rows),
+        'GST Rate*': _pick(rng, GST_RATES, n_rows),
+        'Weight*': rng.integers(80, 900, n_rows),
+        'Inventory*': rng.integers(0, 500, n_rows),
+        'Country Of Origin*': "India",
+        'Pack of*': rng.choice([1, 1, 1, 2, 3], n_rows),
+        'Product Category*': _pick(rng, CATEGORIES, n_rows),
+        'Main Image*': image_base + "_main.jpg",
+        '1 st Image': image_base + "_1.jpg",
+        '2nd Image': "(Optional)",
+        '3rd Image': "(Optional)",
+        '4th Image': "(Optional)",
+        'Product Description*': descriptions,
+    }
+    df = pd.DataFrame(data, columns=SAMPLE_CSV_HEADERS)
+    # Blank descriptions arrive as NaN from read_csv
+    df['Product Description*'] = df['Product Description*'].replace("", np.nan)
+    return df
+
+
+def make_flipkart_frame(n_rows, seed=0, blank_share=0.05):
+    """Builds a Flipkart listing export as read with keep_default_na=False (all values as text)."""
+    rng = np.random.default_rng(seed)
+    index = pd.Series(np.arange(n_rows)).astype(str).str.zfill(7)
+    mrp = rng.integers(4, 40, n_rows) * 100 - 1
+    selling_price = (mrp * rng.uniform(0.4, 0.9, n_rows)).astype(int)
+    bank_settlement = pd.Series((selling_price * rng.uniform(0.6, 0.85, n_rows)).astype(int)).astype(str)
+    bank_settlement[rng.random(n_rows) < blank_share] = ""
+    return pd.DataFrame({
+        'Flipkart Serial Number': index,
+        'Listing ID': "LST" + index,
+        'Seller SKU Id': "SKU-" + index,
+        'Product Title': pd.Series(_pick(rng, ADJECTIVES, n_rows)) + " " + pd.Series(_pick(rng, PRODUCT_TYPES, n_rows)),
+        'MRP': mrp.astype(str),
+        'Your Selling Price': selling_price.astype(str),
+        'Bank Settlement': bank_settlement,
+        'Stock': rng.integers(0, 500, n_rows).astype(str),
+        'Listing Status': _pick(rng, ["ACTIVE", "ACTIVE", "ACTIVE", "INACTIVE"], n_rows),
+    })
+
+
+def make_previous_export(current, seed=0, update_share=0.02, insert_share=0.005, delete_share=0.005, key='Seller SKU Id'):
+    """Derives an older export from current: some rows edited, some missing (inserted since) and some extra (deleted since)."""
+    rng = np.random.default_rng(seed)
+    n_rows = len(current)
+    previous = current.iloc[int(n_rows * insert_share):].copy()
+    edited = rng.random(len(previous)) < update_share
+    previous.loc[edited, 'Stock'] = (rng.integers(0, 500, int(edited.sum()))).astype(str)
+    deleted = current.sample(n=int(n_rows * delete_share), random_state=seed).copy()
+    deleted[key] = "OLD-" + deleted[key]
+    return pd.concat([previous, deleted], ignore_index=True)
+
+
+def make_image_set(n_images, seed=0, sizes=((800, 800), (1500, 1500), (3000, 2000))):
+    """Builds in-memory product photos (JPEG and RGBA PNG) of mixed sizes, as uploaded files."""
+    rng = np.random.default_rng(seed)
+    images = []
+    for i in range(n_images):
+        width, height = sizes[i % len(sizes)]
+        # Smooth gradients plus noise compress like real photos rather than flat colour
+        gradient = np.linspace(0, 255, width, dtype=np.float32)[None, :, None]
+        noise = rng.normal(0, 12, (height, width, 3)).astype(np.float32)
+        pixels = np.clip(gradient * rng.uniform(0.3, 1.0, 3) + noise, 0, 255).astype(np.uint8)
+        image = Image.fromarray(pixels, "RGB")
+        buffer = io.BytesIO()
+        if i % 4 == 3:
+            image.putalpha(255)
+            image.save(buffer, format="PNG")
+            name = f"synthetic_{i}.png"
+        else:
+            image.save(buffer, format="JPEG", quality=92)
+            name = f"synthetic_{i}.jpg"
+        buffer.name = name
+        buffer.seek(0)
+        images.append(buffer)
+    return images
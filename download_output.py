@@ -0,0 +1,116 @@
+import gzip
+import io
+import os
+import tempfile
+import zipfile
+
+# =========================================================================
+# DOWNLOAD OUTPUT (Binary spooled files handed straight to st.download_button)
+# =========================================================================
+# Outputs stay in memory up to this size and spill to a temporary file beyond it.
+SPOOL_MAX_MEMORY = int(os.environ.get("ECOM_SPOOL_MAX_MEMORY", 16 * 1024 * 1024))
+
+COMPRESSION_CHOICES = {"None": None, "GZIP (.gz)": "gzip", "ZIP (.zip)": "zip"}
+COMPRESSION_MIME = {"gzip": "application/gzip", "zip": "application/zip"}
+
+
+class SpooledOutput(io.RawIOBase):
+    """Binary buffer held in memory below max_memory and in an anonymous temp file above it.
+
+    Being a RawIOBase, it is accepted by st.download_button as-is (the button
+    rewinds and reads it), so no intermediate str or extra bytes copy is made.
+    """
+
+    def __init__(self, max_memory=SPOOL_MAX_MEMORY):
+        super().__init__()
+        self.max_memory = max_memory
+        self._file = io.BytesIO()
+        self._rolled_over = False
+
+    @property
+    def rolled_over(self):
+        """True once the data has spilled from memory to disk."""
+        return self._rolled_over
+
+    def rollover(self):
+        if self._rolled_over:
+            return
+        disk_file = tempfile.TemporaryFile()
+        disk_file.write(self._file.getbuffer())
+        disk_file.seek(self._file.tell())
+        self._file.close()
+        self._file = disk_file
+        self._rolled_over = True
+
+    def readable(self):
+        return True
+
+    def writable(self):
+        return True
+
+    def seekable(self):
+        return True
+
+    def write(self, data):
+        if not self._rolled_over and self._file.tell() + len(data) > self.max_memory:
+            self.rollover()
+        return self._file.write(data)
+
+    def read(self, size=-1):
+        return self._file.read(size)
+
+    def readinto(self, buffer):
+        return self._file.readinto(buffer)
+
+    def seek(self, offset, whence=io.SEEK_SET):
+        return self._file.seek(offset, whence)
+
+    def tell(self):
+        return self._file.tell()
+
+    def size(self):
+        """Total bytes written, without moving the read position."""
+        position = self._file.tell()
+        end = self._file.seek(0, io.SEEK_END)
+        self._file.seek(position)
+        return end
+
+    def close(self):
+        if not self.closed:
+            self._file.close()
+        super().close()
+
+
+def compressed_file_name(file_name, compression):
+    """Returns the download name and MIME type for a file after optional compression."""
+    if compression == "gzip":
+        return f"{file_name}.gz", COMPRESSION_MIME["gzip"]
+    if compression == "zip":
+        return f"{os.path.splitext(file_name)[0]}.zip", COMPRESSION_MIME["zip"]
+    return file_name, None
+
+
+def write_output(write, archive_name="data.csv", compression=None, max_memory=SPOOL_MAX_MEMORY):
+    """Calls write(binary_file) against a fresh SpooledOutput, optionally through gzip/zip; returns it rewound.
+
+    archive_name is the member name inside a zip (and the original name recorded by gzip).
+    """
+    output = SpooledOutput(max_memory)
+    if compression == "gzip":
+        with gzip.GzipFile(filename=archive_name, fileobj=output, mode="wb") as gz_file:
+            write(gz_file)
+    elif compression == "zip":
+        with zipfile.ZipFile(output, "w", compression=zipfile.ZIP_DEFLATED) as zip_file:
+            with zip_file.open(archive_name, "w", force_zip64=True) as member:
+                write(member)
+    elif compression is None:
+        write(output)
+    else:
+        raise ValueError(f"Unsupported compression: {compression}")
+    output.seek(0)
+    return output
+
+
+def dataframe_to_csv_output(df, archive_name="data.csv", compression=None, encoding="utf-8", max_memory=SPOOL_MAX_MEMORY):
+    """Streams df as CSV bytes into a SpooledOutput (pandas encodes chunk by chunk, never building one str)."""
+    return write_output(lambda fh: df.to_csv(fh, index=False, encoding=encoding), archive_name=archive_name, compression=compression, max_memory=max_memory)
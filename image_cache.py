@@ -0,0 +1,328 @@
+import base64
+import hashlib
+import io
+import json
+import os
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from requests.adapters import HTTPAdapter
+
+# =========================================================================
+# IMAGE FETCH LAYER (Marketplace logos and listing image previews)
+# =========================================================================
+# Images are stored as <sha256(url)>.<ext> next to a <sha256(url)>.json
+# metadata file holding the ETag/Last-Modified validators of the response;
+# failed fetches leave a <sha256(url)>.fail file with the retry backoff.
+IMAGE_CACHE_DIR = os.environ.get(
+    "ECOM_IMAGE_CACHE_DIR",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache", "images")
+)
+IMAGE_FETCH_TIMEOUT = 10           # seconds per request
+IMAGE_FETCH_WORKERS = 8            # concurrent downloads (and pooled connections per host)
+IMAGE_MAX_AGE = 24 * 60 * 60       # serve from disk without revalidating for this long
+IMAGE_FAILURE_BACKOFF = 5 * 60     # a failed URL is not requested again for this long...
+IMAGE_FAILURE_BACKOFF_MAX = 6 * 60 * 60   # ...doubling per consecutive failure up to this
+IMAGE_CACHE_MAX_BYTES = int(float(os.environ.get("ECOM_IMAGE_CACHE_MB", 512)) * 1024 * 1024)
+IMAGE_MAX_DOWNLOAD_BYTES = int(float(os.environ.get("ECOM_IMAGE_MAX_MB", 20)) * 1024 * 1024)  # larger bodies are abandoned
+PRUNE_INTERVAL = 60                # seconds between size checks triggered by downloads
+THUMBNAIL_SIZE = (128, 128)
+
+CONTENT_TYPE_EXTENSIONS = {
+    "image/png": ".png",
+    "image/jpeg": ".jpg",
+    "image/jpg": ".jpg",
+    "image/gif": ".gif",
+    "image/webp": ".webp",
+    "image/svg+xml": ".svg",
+    "image/x-icon": ".ico",
+    "image/vnd.microsoft.icon": ".ico",
+}
+
+
+def is_remote_url(value):
+    """Returns True for values that look like fetchable http(s) URLs."""
+    return isinstance(value, str) and value.strip().lower().startswith(("http://", "https://"))
+
+
+def build_http_session(pool_size=IMAGE_FETCH_WORKERS):
+    """Creates a requests session whose connection pool matches the worker count."""
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=1)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    session.headers.update({"User-Agent": "FormulaMan-Ecommerce/1.0 (+image-cache)"})
+    return session
+
+
+class ImageCache:
+    """Persistent, revalidating on-disk cache for remote images."""
+
+    def __init__(self, cache_dir=IMAGE_CACHE_DIR, max_workers=IMAGE_FETCH_WORKERS, timeout=IMAGE_FETCH_TIMEOUT, max_age=IMAGE_MAX_AGE, session=None, max_bytes=IMAGE_CACHE_MAX_BYTES, max_download_bytes=IMAGE_MAX_DOWNLOAD_BYTES):
+        self.cache_dir = cache_dir
+        self.max_workers = max_workers
+        self.timeout = timeout
+        self.max_age = max_age
+        self.max_bytes = max_bytes
+        self.max_download_bytes = max_download_bytes
+        self._last_prune = 0.0
+        self.session = session or build_http_session(max_workers)
+        os.makedirs(self.cache_dir, exist_ok=True)
+        self._locks = {}
+        self._locks_guard = threading.Lock()
+
+    # --- Paths and metadata ---
+    def _key(self, url):
+        return hashlib.sha256(url.encode("utf-8")).hexdigest()
+
+    def _meta_path(self, url):
+        return os.path.join(self.cache_dir, self._key(url) + ".json")
+
+    def _failure_path(self, url):
+        return os.path.join(self.cache_dir, self._key(url) + ".fail")
+
+    def _lock_for(self, url):
+        key = self._key(url)
+        with self._locks_guard:
+            return self._locks.setdefault(key, threading.Lock())
+
+    def _read_meta(self, url):
+        try:
+            with open(self._meta_path(url), "r", encoding="utf-8") as fh:
+                meta = json.load(fh)
+        except (OSError, ValueError):
+            return None
+        if not os.path.isfile(os.path.join(self.cache_dir, meta.get("file", ""))):
+            return None
+        return meta
+
+    def _read_failure(self, url):
+        try:
+            with open(self._failure_path(url), "r", encoding="utf-8") as fh:
+                return json.load(fh)
+        except (OSError, ValueError):
+            return None
+
+    def _record_failure(self, url, failure):
+        failures = (failure or {}).get("failures", 0) + 1
+        backoff = min(IMAGE_FAILURE_BACKOFF * 2 ** (failures - 1), IMAGE_FAILURE_BACKOFF_MAX)
+        record = {"url": url, "failures": failures, "retry_at": time.time() + backoff}
+        self._write_atomic(self._failure_path(url), json.dumps(record).encode("utf-8"))
+
+    def _clear_failure(self, url):
+        try:
+            os.remove(self._failure_path(url))
+        except OSError:
+            pass
+
+    def _write_atomic(self, path, data):
+        # mkstemp names are unique across processes sharing the cache directory
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), prefix=os.path.basename(path) + ".", suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as fh:
+                fh.write(data)
+            os.replace(tmp_path, path)
+        except BaseException:
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+            raise
+
+    def _read_image_body(self, response):
+        """Returns the body of an image/* response, or None if it is not an image or exceeds max_download_bytes."""
+        content_type = response.headers.get("Content-Type", "").split(";", 1)[0].strip().lower()
+        if not content_type.startswith("image/"):
+            return None
+        declared = response.headers.get("Content-Length", "")
+        if declared.isdigit() and int(declared) > self.max_download_bytes:
+            return None
+        chunks, total = [], 0
+        for chunk in response.iter_content(chunk_size=64 * 1024):
+            total += len(chunk)
+            if total > self.max_download_bytes:
+                return None
+            chunks.append(chunk)
+        return b"".join(chunks)
+
+    def _extension_for(self, url, content_type):
+        ext = CONTENT_TYPE_EXTENSIONS.get(content_type)
+        if ext:
+            return ext
+        url_ext = os.path.splitext(url.split("?", 1)[0])[1].lower()
+        return url_ext if url_ext in CONTENT_TYPE_EXTENSIONS.values() else ".img"
+
+    def cached_path(self, url):
+        """Returns the local file for a URL if it has been fetched before (no network)."""
+        meta = self._read_meta(url) if is_remote_url(url) else None
+        return os.path.join(self.cache_dir, meta["file"]) if meta else None
+
+    # --- Fetching ---
+    def fetch(self, url, max_age=None):
+        """Returns a local path for the URL, downloading or revalidating it when stale.
+
+        Conditional requests (If-None-Match / If-Modified-Since) are used once a
+        copy exists, and the cached copy is served if the remote is unreachable.
+        A failed URL is not requested again until its backoff expires, so
+        reruns do not block on it; max_age=0 forces a request regardless.
+        Responses that are not image/* or exceed max_download_bytes count as
+        failures. Returns None if the image has never been fetched successfully.
+        """
+        if not is_remote_url(url):
+            return None
+        url = url.strip()
+        max_age = self.max_age if max_age is None else max_age
+        with self._lock_for(url):
+            meta = self._read_meta(url)
+            cached = os.path.join(self.cache_dir, meta["file"]) if meta else None
+            if meta and time.time() - meta.get("fetched_at", 0) < max_age:
+                self._touch(url)
+                return cached
+            failure = self._read_failure(url)
+            if failure and max_age > 0 and time.time() < failure.get("retry_at", 0):
+                return cached
+
+            headers = {}
+            if meta:
+                if meta.get("etag"):
+                    headers["If-None-Match"] = meta["etag"]
+                if meta.get("last_modified"):
+                    headers["If-Modified-Since"] = meta["last_modified"]
+            try:
+                with self.session.get(url, headers=headers, timeout=self.timeout, stream=True) as response:
+                    status = response.status_code
+                    body = self._read_image_body(response) if status == 200 else None
+            except requests.RequestException:
+                self._record_failure(url, failure)
+                return cached
+
+            if status == 304 and meta:
+                meta["fetched_at"] = time.time()
+                self._write_atomic(self._meta_path(url), json.dumps(meta).encode("utf-8"))
+                self._clear_failure(url)
+                return cached
+            if not body:
+                self._record_failure(url, failure)
+                return cached
+
+            content_type = response.headers.get("Content-Type", "").split(";", 1)[0].strip().lower()
+            file_name = self._key(url) + self._extension_for(url, content_type)
+            self._write_atomic(os.path.join(self.cache_dir, file_name), body)
+            if meta and meta.get("file") != file_name:
+                try:
+                    os.remove(os.path.join(self.cache_dir, meta["file"]))
+                except OSError:
+                    pass
+            new_meta = {
+                "url": url,
+                "file": file_name,
+                "content_type": content_type,
+                "etag": response.headers.get("ETag"),
+                "last_modified": response.headers.get("Last-Modified"),
+                "fetched_at": time.time(),
+            }
+            self._write_atomic(self._meta_path(url), json.dumps(new_meta).encode("utf-8"))
+            self._clear_failure(url)
+        if time.time() - self._last_prune > PRUNE_INTERVAL:
+            self.prune()
+        return os.path.join(self.cache_dir, file_name)
+
+    def prefetch(self, urls, max_age=None):
+        """Fetches many URLs concurrently over the pooled session; returns {url: path or None}."""
+        unique_urls = list(dict.fromkeys(u.strip() for u in urls if is_remote_url(u)))
+        if not unique_urls:
+            return {}
+        workers = min(self.max_workers, len(unique_urls))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            paths = executor.map(lambda u: self.fetch(u, max_age=max_age), unique_urls)
+            return dict(zip(unique_urls, paths))
+
+    # --- Thumbnails ---
+    def thumbnail(self, url, size=THUMBNAIL_SIZE):
+        """Returns a local PNG thumbnail for the URL (SVGs are returned as-is)."""
+        source_path = self.fetch(url)
+        if source_path is None or source_path.endswith(".svg"):
+            return source_path
+        thumb_path = os.path.join(self.cache_dir, f"{self._key(url)}_{size[0]}x{size[1]}.png")
+        if os.path.isfile(thumb_path) and os.path.getmtime(thumb_path) >= os.path.getmtime(source_path):
+            return thumb_path
+        from PIL import Image
+        try:
+            with Image.open(source_path) as image:
+                image.thumbnail(size)
+                if image.mode not in ("RGB", "RGBA"):
+                    image = image.convert("RGBA")
+                buffer = io.BytesIO()
+                image.save(buffer, format="PNG", optimize=True)
+        except (OSError, ValueError, Image.DecompressionBombError):
+            # Callers fall back to the original URL
+            return None
+        self._write_atomic(thumb_path, buffer.getvalue())
+        return thumb_path
+
+    def thumbnail_data_uris(self, urls, size=THUMBNAIL_SIZE):
+        """Builds {url: data URI} thumbnails concurrently, for columns that render image URLs."""
+        unique_urls = list(dict.fromkeys(u.strip() for u in urls if is_remote_url(u)))
+        if not unique_urls:
+            return {}
+        workers = min(self.max_workers, len(unique_urls))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            thumb_paths = dict(zip(unique_urls, executor.map(lambda u: self.thumbnail(u, size), unique_urls)))
+        data_uris = {}
+        for url, path in thumb_paths.items():
+            if path is None:
+                continue
+            mime = "image/svg+xml" if path.endswith(".svg") else "image/png"
+            with open(path, "rb") as fh:
+                data_uris[url] = f"data:{mime};base64,{base64.b64encode(fh.read()).decode('ascii')}"
+        return data_uris
+
+    # --- Size cap ---
+    def _touch(self, url):
+        """Marks a URL as recently used; its metadata mtime is the LRU clock for prune()."""
+        try:
+            os.utime(self._meta_path(url))
+        except OSError:
+            pass
+
+    def prune(self):
+        """Deletes the least recently used URLs (image, metadata and thumbnails) until the cache fits in max_bytes; returns bytes freed."""
+        self._last_prune = time.time()
+        groups = {}
+        for entry in os.scandir(self.cache_dir):
+            if not entry.is_file() or entry.name.endswith(".tmp"):
+                continue
+            try:
+                stat = entry.stat()
+            except OSError:
+                continue
+            group = groups.setdefault(entry.name[:64], {"paths": [], "bytes": 0, "used_at": None, "newest": 0.0})
+            group["paths"].append(entry.path)
+            group["bytes"] += stat.st_size
+            group["newest"] = max(group["newest"], stat.st_mtime)
+            if entry.name.endswith(".json"):
+                group["used_at"] = stat.st_mtime
+        total = sum(group["bytes"] for group in groups.values())
+        freed = 0
+        # Metadata mtime is the last use; orphaned files without metadata fall back to their newest file
+        for key, group in sorted(groups.items(), key=lambda item: item[1]["used_at"] or item[1]["newest"]):
+            if total - freed <= self.max_bytes:
+                break
+            with self._locks_guard:
+                lock = self._locks.setdefault(key, threading.Lock())
+            # Skip URLs that are being fetched right now
+            if not lock.acquire(blocking=False):
+                continue
+            try:
+                for path in group["paths"]:
+                    try:
+                        os.remove(path)
+                    except OSError:
+                        pass
+                freed += group["bytes"]
+            finally:
+                lock.release()
+        return freed
@@ -0,0 +1,259 @@
+import asyncio
+import os
+import struct
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+
+import requests
+
+from image_cache import build_http_session, is_remote_url
+
+# =========================================================================
+# IMAGE URL VALIDATION (Reachability, type, dimensions and size checks)
+# =========================================================================
+# Limits follow the strictest of the major marketplaces we list on.
+MIN_IMAGE_DIMENSION = 500                  # px, shortest side
+MAX_IMAGE_BYTES = 10 * 1024 * 1024         # 10 MB
+ALLOWED_IMAGE_TYPES = ("image/jpeg", "image/jpg", "image/png", "image/webp")
+HEADER_READ_LIMIT = 256 * 1024             # give up on dimension decoding after this many bytes
+
+VALIDATION_CONCURRENCY = int(os.environ.get("ECOM_VALIDATION_CONCURRENCY", 64))    # requests in flight across all hosts
+# Requests per second per host (0 disables). Listing images usually sit on one CDN host, so this
+# sets the pace: 200/s checks 100k URLs in about 8.5 minutes. Lower it for hosts that throttle.
+VALIDATION_HOST_RATE = float(os.environ.get("ECOM_VALIDATION_HOST_RATE", 200.0))
+VALIDATION_TIMEOUT = 10                    # seconds per request
+VALIDATION_CACHE_TTL = 6 * 60 * 60         # seconds a definitive result is reused
+TRANSIENT_HTTP_STATUSES = (408, 425, 429)  # plus every 5xx: retried on the next run instead of cached
+VALIDATION_CACHE_SIZE = 200_000            # URLs kept in the result cache
+
+
+class ValidationCache:
+    """Thread-safe LRU of validation results keyed by URL, with expiry."""
+
+    def __init__(self, ttl=VALIDATION_CACHE_TTL, max_entries=VALIDATION_CACHE_SIZE):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, url):
+        with self._lock:
+            entry = self._entries.get(url)
+            if entry is None:
+                return None
+            checked_at, result = entry
+            if time.time() - checked_at > self.ttl:
+                del self._entries[url]
+                return None
+            self._entries.move_to_end(url)
+            return result
+
+    def put(self, url, result):
+        with self._lock:
+            self._entries[url] = (time.time(), result)
+            self._entries.move_to_end(url)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class HostRateLimiter:
+    """Spaces requests to the same host at a fixed interval (event-loop local)."""
+
+    def __init__(self, rate_per_host=VALIDATION_HOST_RATE):
+        self.interval = 1.0 / rate_per_host if rate_per_host else 0.0
+        self._next_slot = {}
+
+    async def wait(self, host):
+        if not self.interval:
+            return
+        now = asyncio.get_running_loop().time()
+        slot = max(now, self._next_slot.get(host, now))
+        self._next_slot[host] = slot + self.interval
+        if slot > now:
+            await asyncio.sleep(slot - now)
+
+
+def _empty_result(url, issue=None):
+    return {"url": url, "ok": False, "http_status": None, "content_type": None, "width": None, "height": None, "bytes": None, "issue": issue}
+
+
+def is_transient(result):
+    """True for outcomes that may change on retry (timeouts, connection errors, 5xx), which are not cached."""
+    status = result.get("http_status")
+    return status is None or status >= 500 or status in TRANSIENT_HTTP_STATUSES
+
+
+def _header_size(data):
+    """(width, height) read from a PNG, JPEG or WebP header, without decoding; None if not found."""
+    try:
+        if data[:8] == b"\x89PNG\r\n\x1a\n" and data[12:16] == b"IHDR":
+            return struct.unpack(">II", data[16:24])
+        if data[:4] == b"RIFF" and data[8:12] == b"WEBP":
+            chunk = data[12:16]
+            if chunk == b"VP8 ":
+                width, height = struct.unpack("<HH", data[26:30])
+                return width & 0x3FFF, height & 0x3FFF
+            if chunk == b"VP8L":
+                bits = int.from_bytes(data[21:25], "little")
+                return (bits & 0x3FFF) + 1, ((bits >> 14) & 0x3FFF) + 1
+            if chunk == b"VP8X":
+                return int.from_bytes(data[24:27], "little") + 1, int.from_bytes(data[27:30], "little") + 1
+            return None
+        if data[:2] == b"\xff\xd8":
+            # Walk the marker segments up to the first start-of-frame (SOFn, excluding DHT/JPG/DAC)
+            i = 2
+            while i + 9 < len(data):
+                if data[i] != 0xFF:
+                    return None
+                marker = data[i + 1]
+                if marker == 0xFF:
+                    i += 1
+                    continue
+                if 0xD0 <= marker <= 0xD9 or marker == 0x01:
+                    i += 2
+                    continue
+                if 0xC0 <= marker <= 0xCF and marker not in (0xC4, 0xC8, 0xCC):
+                    height, width = struct.unpack(">HH", data[i + 5:i + 9])
+                    return width, height
+                i += 2 + struct.unpack(">H", data[i + 2:i + 4])[0]
+    except (struct.error, IndexError):
+        pass
+    return None
+
+
+def probe_image(session, url, timeout=VALIDATION_TIMEOUT, min_dimension=MIN_IMAGE_DIMENSION, max_bytes=MAX_IMAGE_BYTES):
+    """Checks a single image URL, decoding only the image header for its dimensions."""
+    from PIL import Image, ImageFile
+
+    result = _empty_result(url)
+    parser = None
+    try:
+        with session.get(url, stream=True, timeout=timeout) as response:
+            result["http_status"] = response.status_code
+            if response.status_code != 200:
+                result["issue"] = f"Unreachable (HTTP {response.status_code})"
+                return result
+            content_type = response.headers.get("Content-Type", "").split(";", 1)[0].strip().lower()
+            result["content_type"] = content_type
+            if content_type not in ALLOWED_IMAGE_TYPES:
+                result["issue"] = f"Unsupported content type '{content_type or 'unknown'}'"
+                return result
+            content_length = response.headers.get("Content-Length")
+            if content_length and content_length.isdigit():
+                result["bytes"] = int(content_length)
+
+            parser = ImageFile.Parser()
+            read = 0
+            for chunk in response.iter_content(chunk_size=16 * 1024):
+                read += len(chunk)
+                if parser.image is None:
+                    parser.feed(chunk)
+                if parser.image is not None and result["bytes"] is not None:
+                    break
+                if parser.image is None and read > HEADER_READ_LIMIT:
+                    break
+                if read > max_bytes:
+                    break
+            if result["bytes"] is None:
+                result["bytes"] = read
+            if parser.image is None:
+                result["issue"] = "Unreadable image data"
+                return result
+            result["width"], result["height"] = parser.image.size
+    except requests.RequestException as e:
+        result["issue"] = f"Unreachable ({type(e).__name__})"
+        return result
+    except Image.DecompressionBombError:
+        # The header declares more pixels than Pillow will open; no marketplace accepts such an image
+        size = _header_size(parser.data or b"") if parser is not None else None
+        result["width"], result["height"] = size or (None, None)
+        result["issue"] = f"Too large ({size[0]}x{size[1]} px)" if size else "Too large (pixel count exceeds decoder limit)"
+        return result
+    except (OSError, SyntaxError, ValueError):
+        result["issue"] = "Unreadable image data"
+        return result
+
+    if result["bytes"] > max_bytes:
+        result["issue"] = f"File too large ({result['bytes'] // 1024} KB)"
+    elif min(result["width"], result["height"]) < min_dimension:
+        result["issue"] = f"Too small ({result['width']}x{result['height']} px, minimum {min_dimension} px)"
+    else:
+        result["ok"] = True
+    return result
+
+
+async def _validate_async(urls, session, cache, concurrency, rate_per_host, timeout, min_dimension, max_bytes):
+    loop = asyncio.get_running_loop()
+    semaphore = asyncio.Semaphore(concurrency)
+    limiter = HostRateLimiter(rate_per_host)
+
+    async def validate_one(url, executor):
+        cached = cache.get(url)
+        if cached is not None:
+            return cached
+        # Wait for the host's rate slot before taking a concurrency slot so a hot host cannot starve the others
+        await limiter.wait(urlsplit(url).netloc)
+        async with semaphore:
+            result = await loop.run_in_executor(executor, probe_image, session, url, timeout, min_dimension, max_bytes)
+        if not is_transient(result):
+            cache.put(url, result)
+        return result
+
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        # One unexpected failure is reported for its URL instead of aborting the whole batch
+        checked = await asyncio.gather(*(validate_one(url, executor) for url in urls), return_exceptions=True)
+    return [_empty_result(url, f"Check failed ({type(result).__name__})") if isinstance(result, BaseException) else result for url, result in zip(urls, checked)]
+
+
+def validate_image_urls(urls, cache=None, session=None, concurrency=VALIDATION_CONCURRENCY, rate_per_host=VALIDATION_HOST_RATE, timeout=VALIDATION_TIMEOUT, min_dimension=MIN_IMAGE_DIMENSION, max_bytes=MAX_IMAGE_BYTES):
+    """Validates image URLs with bounded concurrency; returns {url: result dict}.
+
+    Values that are not http(s) URLs are reported as invalid without a request.
+    """
+    cache = cache if cache is not None else ValidationCache()
+    unique_values = list(dict.fromkeys(str(u).strip() for u in urls))
+    results = {}
+    remote_urls = []
+    for value in unique_values:
+        if is_remote_url(value):
+            remote_urls.append(value)
+        else:
+            results[value] = _empty_result(value, "Not a valid http(s) URL")
+    if remote_urls:
+        session = session or build_http_session(concurrency)
+        checked = asyncio.run(_validate_async(remote_urls, session, cache, concurrency, rate_per_host, timeout, min_dimension, max_bytes))
+        results.update(zip(remote_urls, checked))
+    return results
+
+
+def validate_frame_images(df, image_columns, required_columns=(), sku_col='SKU Code*', **kwargs):
+    """Validates every image URL in the frame; returns a per-URL report DataFrame.
+
+    Optional columns are skipped when they hold blanks or placeholders such as
+    "(Optional)"; required columns are always checked.
+    """
+    import pandas as pd
+
+    image_columns = [col for col in image_columns if col in df.columns]
+    melted = df.melt(id_vars=[sku_col] if sku_col in df.columns else None, value_vars=image_columns, var_name='Image Column', value_name='Image URL')
+    melted['Image URL'] = melted['Image URL'].fillna('').astype(str).str.strip()
+    is_required = melted['Image Column'].isin(required_columns)
+    melted = melted[is_required | melted['Image URL'].map(is_remote_url)]
+
+    results = validate_image_urls(melted['Image URL'].unique(), **kwargs)
+    report = pd.DataFrame.from_records(list(results.values()), columns=["url", "ok", "http_status", "content_type", "width", "height", "bytes", "issue"])
+    report.rename(columns={"url": "Image URL", "ok": "Valid", "http_status": "HTTP Status", "content_type": "Content Type", "width": "Width", "height": "Height", "bytes": "File Size (Bytes)", "issue": "Issue"}, inplace=True)
+    report = report.astype({"HTTP Status": "Int64", "Width": "Int64", "Height": "Int64", "File Size (Bytes)": "Int64", "Valid": bool})
+
+    usage = melted.groupby('Image URL').agg(**{
+        'Image Column': ('Image Column', lambda cols: ', '.join(sorted(set(cols)))),
+        'SKUs Affected': ('Image Column', 'size'),
+    }).reset_index()
+    report = report.merge(usage, on='Image URL', how='left')
+    return report.sort_values(by=['Valid', 'SKUs Affected'], ascending=[True, False], ignore_index=True)
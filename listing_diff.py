@@ -0,0 +1,130 @@
+import os
+
+# =========================================================================
+# LISTING DIFF ENGINE (Minimal delta against a previous marketplace export)
+# =========================================================================
+CHANGE_TYPE_COL = 'Change Type'
+CHANGED_FLAG_PREFIX = 'Changed: '
+INSERTED, UPDATED, DELETED = 'INSERTED', 'UPDATED', 'DELETED'
+
+
+def read_previous_export(uploaded_file):
+    """Reads a previous export (CSV, gzip/zip-compressed CSV or Excel) with every value kept as text."""
+    import pandas as pd
+
+    file_name = uploaded_file.name.lower()
+    if file_name.endswith(('.xlsx', '.xls')):
+        return pd.read_excel(uploaded_file, dtype=str, keep_default_na=False)
+    compression = 'gzip' if file_name.endswith('.gz') else ('zip' if file_name.endswith('.zip') else None)
+    return pd.read_csv(uploaded_file, dtype=str, keep_default_na=False, compression=compression)
+
+
+def _normalized_text(series):
+    """Text form used for comparison: missing values become '' and surrounding whitespace is ignored."""
+    return series.astype('string').fillna('').str.strip()
+
+
+def _values_differ(previous, current):
+    """Vectorized per-row inequality of two aligned text Series; '499' and '499.0' count as equal."""
+    import pandas as pd
+
+    differ = (previous.to_numpy() != current.to_numpy()).astype(bool)
+    if differ.any():
+        previous_num = pd.to_numeric(previous[differ], errors='coerce').to_numpy(dtype=float, na_value=float('nan'))
+        current_num = pd.to_numeric(current[differ], errors='coerce').to_numpy(dtype=float, na_value=float('nan'))
+        differ[differ] = ~(previous_num == current_num)
+    return differ
+
+
+def diff_exports(previous, current, key='SKU Code*', compare_columns=None):
+    """Aligns two exports on key and returns (delta, stats) with only inserted, updated and deleted rows.
+
+    Rows are matched through one hash-table lookup on the key; whole-row
+    hashes skip unchanged rows before the per-column comparison, so the work
+    stays a handful of vectorized passes even for million-row catalogs. The
+    delta holds current values for inserted/updated rows and previous values
+    for deleted ones, a 'Change Type' column and a 'Changed: <column>' flag
+    per compared column. Duplicate keys keep their last occurrence.
+    """
+    import numpy as np
+    import pandas as pd
+
+    for name, frame in (("previous", previous), ("current", current)):
+        if key not in frame.columns:
+            raise KeyError(f"Key column '{key}' is missing from the {name} export.")
+
+    previous_keys = _normalized_text(previous[key])
+    current_keys = _normalized_text(current[key])
+    previous_unique = ~previous_keys.duplicated(keep='last').to_numpy()
+    current_unique = ~current_keys.duplicated(keep='last').to_numpy()
+    duplicates = int((~previous_unique).sum() + (~current_unique).sum())
+    previous, previous_keys = previous[previous_unique], previous_keys[previous_unique]
+    current, current_keys = current[current_unique], current_keys[current_unique]
+
+    if compare_columns is None:
+        compare_columns = [col for col in current.columns if col in previous.columns and col != key]
+
+    # Hash index on the previous keys: position of every current SKU in the previous export, -1 if new
+    positions = pd.Index(previous_keys.to_numpy(dtype=object)).get_indexer(current_keys.to_numpy(dtype=object))
+    in_previous = positions >= 0
+    matched = np.zeros(len(previous), dtype=bool)
+    matched[positions[in_previous]] = True
+    previous_rows = positions[in_previous]
+    current_rows = np.flatnonzero(in_previous)
+
+    previous_common = pd.DataFrame({col: _normalized_text(previous[col].iloc[previous_rows]).reset_index(drop=True) for col in compare_columns})
+    current_common = pd.DataFrame({col: _normalized_text(current[col].iloc[current_rows]).reset_index(drop=True) for col in compare_columns})
+    # Whole-row hashes: rows whose normalized text is identical need no per-column check
+    candidate = pd.util.hash_pandas_object(previous_common, index=False).to_numpy() != pd.util.hash_pandas_object(current_common, index=False).to_numpy()
+
+    flags = np.zeros((len(current_rows), len(compare_columns)), dtype=bool)
+    if candidate.any():
+        for i, col in enumerate(compare_columns):
+            flags[candidate, i] = _values_differ(previous_common[col][candidate], current_common[col][candidate])
+    updated = flags.any(axis=1)
+
+    inserted_rows = np.flatnonzero(~in_previous)
+    updated_rows = current_rows[updated]
+    deleted_rows = np.flatnonzero(~matched)
+    shared_columns = [col for col in current.columns if col in previous.columns]
+
+    delta = pd.concat([
+        current.iloc[inserted_rows].assign(**{CHANGE_TYPE_COL: INSERTED}),
+        current.iloc[updated_rows].assign(**{CHANGE_TYPE_COL: UPDATED}),
+        previous.iloc[deleted_rows][shared_columns].assign(**{CHANGE_TYPE_COL: DELETED}),
+    ], ignore_index=True)
+    # Columns only in the current export are missing on deleted rows; concat would turn ints into floats (4 -> 4.0)
+    for col in current.columns:
+        dtype = current[col].dtype
+        if col in previous.columns or delta[col].dtype == dtype:
+            continue
+        if not len(deleted_rows):
+            delta[col] = delta[col].astype(dtype)
+        elif dtype.kind in 'iu':
+            delta[col] = delta[col].astype('Int64')
+        elif dtype.kind == 'b':
+            delta[col] = delta[col].astype('boolean')
+    delta_flags = np.zeros((len(delta), len(compare_columns)), dtype=bool)
+    delta_flags[len(inserted_rows):len(inserted_rows) + len(updated_rows)] = flags[updated]
+    for i, col in enumerate(compare_columns):
+        delta[f"{CHANGED_FLAG_PREFIX}{col}"] = delta_flags[:, i]
+    delta = delta[[key, CHANGE_TYPE_COL] + [col for col in delta.columns if col not in (key, CHANGE_TYPE_COL)]]
+
+    column_counts = flags[updated].sum(axis=0)
+    stats = {
+        "inserted": len(inserted_rows),
+        "updated": len(updated_rows),
+        "deleted": len(deleted_rows),
+        "unchanged": len(current_rows) - len(updated_rows),
+        "duplicate_keys": duplicates,
+        "columns_changed": {col: int(n) for col, n in zip(compare_columns, column_counts) if n},
+        "added_columns": [col for col in current.columns if col not in previous.columns],
+        "removed_columns": [col for col in previous.columns if col not in current.columns],
+    }
+    return delta, stats
+
+
+def delta_file_name(file_name):
+    """Download name for the delta of an export."""
+    stem, ext = os.path.splitext(file_name)
+    return f"{stem}_DELTA{ext or '.csv'}"
@@ -0,0 +1,299 @@
+import cProfile
+import io
+import math
+import os
+import pstats
+import sqlite3
+import sys
+import threading
+import time
+from contextlib import contextmanager
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+# =========================================================================
+# HOT-PATH INSTRUMENTATION (Stage timings kept in a local SQLite ring buffer)
+# =========================================================================
+PERF_DB_PATH = os.environ.get(
+    "ECOM_PERF_DB",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache", "perf.sqlite3")
+)
+PERF_LOG_MAX_ROWS = 20_000      # oldest stage records are dropped beyond this
+PERF_MAX_PROFILES = 20          # cProfile captures kept
+PROFILE_TOP_FUNCTIONS = 40      # functions listed per capture
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS stage_log (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    recorded_at REAL NOT NULL,
+    tool TEXT NOT NULL,
+    stage TEXT NOT NULL,
+    seconds REAL NOT NULL,
+    rows INTEGER,
+    peak_rss_mb REAL,
+    rerun INTEGER,
+    username TEXT,
+    rss_delta_mb REAL
+);
+CREATE INDEX IF NOT EXISTS idx_stage_log_tool_stage ON stage_log (tool, stage);
+CREATE TABLE IF NOT EXISTS profiles (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    recorded_at REAL NOT NULL,
+    tool TEXT NOT NULL,
+    username TEXT,
+    report TEXT NOT NULL
+);
+"""
+
+_enabled = True
+_db_lock = threading.Lock()
+_initialized_paths = set()
+# Streamlit runs every session's script in its own thread, so the run context is thread-local
+_run_context = threading.local()
+
+
+def set_enabled(enabled):
+    """Turns stage recording on or off for the whole process (e.g. off for benchmarks)."""
+    global _enabled
+    _enabled = enabled
+
+
+def set_run_context(username=None, rerun=None):
+    """Attaches the current user and Streamlit rerun number to stages recorded on this thread."""
+    _run_context.username = username
+    _run_context.rerun = rerun
+    _run_context.stages = []
+
+
+def stages_recorded():
+    """Names of the stages recorded on this thread since the last set_run_context()."""
+    return list(getattr(_run_context, "stages", []))
+
+
+def peak_rss_mb():
+    """Lifetime peak resident set size of this process in MB, or None where unavailable."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is reported in bytes on macOS and in kilobytes elsewhere
+    divisor = 1024 * 1024 if sys.platform == "darwin" else 1024
+    return round(peak / divisor, 1)
+
+
+try:
+    _PAGE_SIZE = os.sysconf("SC_PAGE_SIZE")
+except (AttributeError, ValueError, OSError):
+    _PAGE_SIZE = None
+
+
+def current_rss_mb():
+    """Current resident set size of this process in MB.
+
+    Read from /proc/self/statm; where that is unavailable (macOS) this falls
+    back to the lifetime peak from getrusage, the best figure available there.
+    """
+    if _PAGE_SIZE:
+        try:
+            with open("/proc/self/statm", "r") as fh:
+                resident_pages = int(fh.read().split()[1])
+            return round(resident_pages * _PAGE_SIZE / (1024 * 1024), 1)
+        except (OSError, ValueError, IndexError):
+            pass
+    return peak_rss_mb()
+
+
+def _stage_memory(rss_start, peak_start):
+    """Returns (stage peak RSS, RSS growth) in MB from samples taken at stage start and now.
+
+    The peak is the larger of the two current-RSS samples, unless the stage
+    raised the process high-water mark, in which case that new mark is the
+    stage's exact peak. Sessions share the process, so both figures also
+    include whatever other sessions allocated meanwhile.
+    """
+    rss_end = current_rss_mb()
+    peak_end = peak_rss_mb()
+    samples = [v for v in (rss_start, rss_end) if v is not None]
+    if peak_start is not None and peak_end is not None and peak_end > peak_start:
+        samples.append(peak_end)
+    delta = round(rss_end - rss_start, 1) if rss_start is not None and rss_end is not None else None
+    return (max(samples) if samples else None), delta
+
+
+@contextmanager
+def _connect(db_path=None):
+    """Opens the log database (creating it on first use), committing and closing on exit."""
+    db_path = db_path or PERF_DB_PATH
+    if db_path not in _initialized_paths:
+        os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+    conn = sqlite3.connect(db_path, timeout=5)
+    try:
+        if db_path not in _initialized_paths:
+            conn.executescript(_SCHEMA)
+            try:
+                # Logs created before per-stage memory was recorded
+                conn.execute("ALTER TABLE stage_log ADD COLUMN rss_delta_mb REAL")
+            except sqlite3.OperationalError:
+                pass
+            _initialized_paths.add(db_path)
+        with conn:
+            yield conn
+    finally:
+        conn.close()
+
+
+def record_stage(tool, stage, seconds, rows=None, peak_rss=None, rss_delta=None, db_path=None):
+    """Appends one stage measurement (memory in MB, for this stage only), trimming the log to PERF_LOG_MAX_ROWS."""
+    if not _enabled:
+        return
+    username = getattr(_run_context, "username", None)
+    rerun = getattr(_run_context, "rerun", None)
+    if not hasattr(_run_context, "stages"):
+        _run_context.stages = []
+    _run_context.stages.append(stage)
+    try:
+        with _db_lock, _connect(db_path) as conn:
+            cursor = conn.execute(
+                "INSERT INTO stage_log (recorded_at, tool, stage, seconds, rows, peak_rss_mb, rss_delta_mb, rerun, username) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (time.time(), tool, stage, seconds, rows, peak_rss, rss_delta, rerun, username),
+            )
+            if cursor.lastrowid % 100 == 0:
+                conn.execute("DELETE FROM stage_log WHERE id <= ?", (cursor.lastrowid - PERF_LOG_MAX_ROWS,))
+    except (sqlite3.Error, OSError):
+        # Instrumentation must never break the tool it measures
+        pass
+
+
+@contextmanager
+def track_stage(tool, stage, rows=None, db_path=None):
+    """Times the enclosed block as one stage of a tool.
+
+    Yields a dict; set its "rows" key inside the block when the row count is
+    only known after the work is done.
+    """
+    info = {"rows": rows}
+    if not _enabled:
+        yield info
+        return
+    rss_start, peak_start = current_rss_mb(), peak_rss_mb()
+    start = time.perf_counter()
+    try:
+        yield info
+    finally:
+        seconds = time.perf_counter() - start
+        peak_rss, rss_delta = _stage_memory(rss_start, peak_start)
+        record_stage(tool, stage, seconds, info["rows"], peak_rss=peak_rss, rss_delta=rss_delta, db_path=db_path)
+
+
+def _percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return None
+    rank = max(1, math.ceil(pct / 100 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+def stage_summary(since=None, db_path=None):
+    """Returns one dict per (tool, stage) with run count, p50/p95 wall time and rows, and stage memory.
+
+    Returns None if the log cannot be read (locked by a writer or corrupt).
+    """
+    query = "SELECT tool, stage, seconds, rows, peak_rss_mb, rss_delta_mb FROM stage_log"
+    params = ()
+    if since is not None:
+        query += " WHERE recorded_at >= ?"
+        params = (since,)
+    try:
+        with _db_lock, _connect(db_path) as conn:
+            records = conn.execute(query + " ORDER BY id", params).fetchall()
+    except (sqlite3.Error, OSError):
+        return None
+
+    grouped = {}
+    for tool, stage, seconds, rows, rss, rss_delta in records:
+        group = grouped.setdefault((tool, stage), {"seconds": [], "rows": [], "rss": [], "rss_delta": []})
+        group["seconds"].append(seconds)
+        if rows is not None:
+            group["rows"].append(rows)
+        if rss is not None:
+            group["rss"].append(rss)
+        if rss_delta is not None:
+            group["rss_delta"].append(rss_delta)
+
+    summary = []
+    for (tool, stage), group in grouped.items():
+        seconds = sorted(group["seconds"])
+        rows = sorted(group["rows"])
+        summary.append({
+            "tool": tool,
+            "stage": stage,
+            "runs": len(seconds),
+            "p50_ms": round(_percentile(seconds, 50) * 1000, 1),
+            "p95_ms": round(_percentile(seconds, 95) * 1000, 1),
+            "p50_rows": _percentile(rows, 50),
+            "max_rows": rows[-1] if rows else None,
+            "peak_rss_mb": max(group["rss"]) if group["rss"] else None,
+            "p95_rss_delta_mb": _percentile(sorted(group["rss_delta"]), 95),
+        })
+    return summary
+
+
+def clear_log(db_path=None):
+    """Deletes all stage records and profiles; returns False if the log could not be written."""
+    try:
+        with _db_lock, _connect(db_path) as conn:
+            conn.execute("DELETE FROM stage_log")
+            conn.execute("DELETE FROM profiles")
+    except (sqlite3.Error, OSError):
+        return False
+    return True
+
+
+# =========================================================================
+# cPROFILE CAPTURE
+# =========================================================================
+@contextmanager
+def profile_run():
+    """Profiles the enclosed block; yields a dict whose "report" key holds the pstats text afterwards."""
+    result = {"report": None}
+    profiler = cProfile.Profile()
+    try:
+        profiler.enable()
+    except ValueError:
+        # Only one profiler can be active per process; another session is already being profiled
+        yield result
+        return
+    try:
+        yield result
+    finally:
+        profiler.disable()
+        buffer = io.StringIO()
+        pstats.Stats(profiler, stream=buffer).strip_dirs().sort_stats("cumulative").print_stats(PROFILE_TOP_FUNCTIONS)
+        result["report"] = buffer.getvalue()
+
+
+def save_profile(tool, report, db_path=None):
+    """Stores a cProfile report, keeping the newest PERF_MAX_PROFILES; returns False if it could not be saved."""
+    try:
+        with _db_lock, _connect(db_path) as conn:
+            conn.execute(
+                "INSERT INTO profiles (recorded_at, tool, username, report) VALUES (?, ?, ?, ?)",
+                (time.time(), tool, getattr(_run_context, "username", None), report),
+            )
+            conn.execute("DELETE FROM profiles WHERE id NOT IN (SELECT id FROM profiles ORDER BY id DESC LIMIT ?)", (PERF_MAX_PROFILES,))
+    except (sqlite3.Error, OSError):
+        # Instrumentation must never break the tool it measures
+        return False
+    return True
+
+
+def recent_profiles(limit=5, db_path=None):
+    """Returns the newest cProfile captures as dicts (recorded_at, tool, username, report); empty if the log cannot be read."""
+    try:
+        with _db_lock, _connect(db_path) as conn:
+            records = conn.execute("SELECT recorded_at, tool, username, report FROM profiles ORDER BY id DESC LIMIT ?", (limit,)).fetchall()
+    except (sqlite3.Error, OSError):
+        return []
+    return [{"recorded_at": r[0], "tool": r[1], "username": r[2], "report": r[3]} for r in records]
@@ -0,0 +1,128 @@
+import hashlib
+import json
+import os
+import tempfile
+import time
+
+# =========================================================================
+# SHARED RESULT STORE (Content-addressed files shared by every process on the host)
+# =========================================================================
+RESULT_STORE_DIR = os.environ.get(
+    "ECOM_RESULT_STORE_DIR",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache", "results")
+)
+RESULT_STORE_MAX_BYTES = int(float(os.environ.get("ECOM_RESULT_STORE_MB", 2048)) * 1024 * 1024)
+PRUNE_INTERVAL = 60                 # seconds between size checks triggered by put()
+
+
+def content_key(*parts):
+    """SHA-256 hex digest over bytes and JSON-serialisable parts, e.g. (task, params, input key)."""
+    digest = hashlib.sha256()
+    for part in parts:
+        if not isinstance(part, (bytes, bytearray, memoryview)):
+            part = json.dumps(part, sort_keys=True, default=str).encode("utf-8")
+        digest.update(len(part).to_bytes(8, "little"))
+        digest.update(part)
+    return digest.hexdigest()
+
+
+class ResultStore:
+    """Immutable blobs on disk, one file per SHA-256 key.
+
+    Writers go through a temp file and os.replace, so Streamlit replicas and
+    worker processes can share one directory without locking: a key is either
+    absent or complete, and two writers of the same key write identical bytes.
+    Reads refresh the file's mtime, and prune() drops the least recently used
+    files once the directory exceeds max_bytes. Only processes on this host
+    should write here, since stored results are unpickled by the app.
+    """
+
+    def __init__(self, root=RESULT_STORE_DIR, max_bytes=RESULT_STORE_MAX_BYTES):
+        self.root = root
+        self.max_bytes = max_bytes
+        self._last_prune = 0.0
+        os.makedirs(self.root, exist_ok=True)
+
+    def path(self, key):
+        if len(key) != 64 or any(c not in "0123456789abcdef" for c in key):
+            raise ValueError(f"Invalid result key: {key!r}")
+        return os.path.join(self.root, key[:2], key)
+
+    def has(self, key):
+        try:
+            return os.path.exists(self.path(key))
+        except ValueError:
+            return False
+
+    def get(self, key):
+        """Returns the bytes stored under key, or None."""
+        path = self.path(key)
+        try:
+            with open(path, "rb") as fh:
+                data = fh.read()
+        except FileNotFoundError:
+            return None
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return data
+
+    def put(self, data, key=None):
+        """Stores data under key (default: its own content hash) and returns the key."""
+        key = key or content_key(data)
+        path = self.path(key)
+        try:
+            # Already stored (possibly by another process): just mark it as recently used
+            os.utime(path)
+            return key
+        except FileNotFoundError:
+            pass
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), prefix=".tmp-")
+        try:
+            with os.fdopen(fd, "wb") as fh:
+                fh.write(data)
+            os.replace(tmp_path, path)
+        except BaseException:
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+            raise
+        if time.time() - self._last_prune > PRUNE_INTERVAL:
+            self.prune()
+        return key
+
+    def size_bytes(self):
+        return sum(size for _, _, size in self._files())
+
+    def prune(self):
+        """Deletes least recently used blobs until the store fits in max_bytes; returns bytes freed."""
+        self._last_prune = time.time()
+        files = sorted(self._files(), key=lambda f: f[1])
+        total = sum(size for _, _, size in files)
+        freed = 0
+        for path, _, size in files:
+            if total - freed <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+                freed += size
+            except OSError:
+                pass
+        return freed
+
+    def _files(self):
+        """(path, mtime, size) of every stored blob, skipping in-progress temp files."""
+        for shard in os.scandir(self.root):
+            if not shard.is_dir():
+                continue
+            for entry in os.scandir(shard.path):
+                if entry.name.startswith(".tmp-"):
+                    continue
+                try:
+                    stat = entry.stat()
+                except OSError:
+                    continue
+                yield entry.path, stat.st_mtime, stat.st_size
@@ -0,0 +1,247 @@
+import os
+import pickle
+import shutil
+import sys
+import threading
+import time
+import uuid
+from collections import OrderedDict
+
+# =========================================================================
+# SESSION ARTIFACT STORE (Large per-session objects kept out of st.session_state)
+# =========================================================================
+ARTIFACT_STORE_DIR = os.environ.get(
+    "ECOM_ARTIFACT_DIR",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache", "artifacts")
+)
+USER_MEMORY_BUDGET = int(float(os.environ.get("ECOM_USER_MEMORY_MB", 256)) * 1024 * 1024)    # per browser session
+GLOBAL_MEMORY_BUDGET = int(float(os.environ.get("ECOM_GLOBAL_MEMORY_MB", 1024)) * 1024 * 1024)
+ARTIFACT_TTL = 12 * 60 * 60         # artifacts untouched for this long are deleted, memory and disk
+
+# Low-cardinality listing columns retained as categoricals
+CATEGORICAL_COLUMNS = ('Group Name*', 'Brand*', 'Product Category*', 'Size')
+CATEGORICAL_MAX_RATIO = 0.5         # skip columns whose unique values exceed this share of rows
+
+
+def compact_frame(df, categorical_columns=CATEGORICAL_COLUMNS, max_ratio=CATEGORICAL_MAX_RATIO):
+    """Returns df with repetitive text columns as categoricals and integer columns downcast."""
+    import pandas as pd
+
+    df = df.copy()
+    for col in categorical_columns:
+        if col in df.columns and not isinstance(df[col].dtype, pd.CategoricalDtype) and len(df):
+            if df[col].nunique(dropna=False) <= max_ratio * len(df):
+                df[col] = df[col].astype('category')
+    for col in df.select_dtypes(include='integer').columns:
+        df[col] = pd.to_numeric(df[col], downcast='integer')
+    return df
+
+
+def estimate_nbytes(obj):
+    """Approximate in-memory size of an artifact in bytes."""
+    if hasattr(obj, "memory_usage") and hasattr(obj, "columns"):
+        return int(obj.memory_usage(index=True, deep=True).sum())
+    if isinstance(obj, (bytes, bytearray, memoryview)):
+        return len(obj)
+    if hasattr(obj, "getbuffer"):
+        return obj.getbuffer().nbytes
+    if hasattr(obj, "size") and hasattr(obj, "getbands"):
+        # PIL image: decoded pixel buffer
+        return obj.size[0] * obj.size[1] * len(obj.getbands())
+    try:
+        return len(pickle.dumps(obj, protocol=pickle.HIGHEST_PROTOCOL))
+    except Exception:
+        return sys.getsizeof(obj)
+
+
+class ArtifactStore:
+    """Process-wide, handle-based store for large session artifacts.
+
+    Sessions keep only the handle string in st.session_state. Objects stay in
+    memory while their owner and the process are within budget; when a budget
+    is exceeded the least recently used objects are spilled to disk and
+    transparently reloaded by get(). Stored objects must be treated as
+    read-only, since a spilled copy is never rewritten. Pickling and
+    unpickling happen outside the store lock, so one session's spill does not
+    block the others.
+    """
+
+    def __init__(self, root=ARTIFACT_STORE_DIR, user_budget=USER_MEMORY_BUDGET, global_budget=GLOBAL_MEMORY_BUDGET, ttl=ARTIFACT_TTL):
+        # One directory per process, so several app processes can share the same root
+        self.root = os.path.join(root, f"proc-{os.getpid()}")
+        self.user_budget = user_budget
+        self.global_budget = global_budget
+        self.ttl = ttl
+        # Leftovers from an earlier process with the same pid are unreachable (their handles lived in old sessions)
+        shutil.rmtree(self.root, ignore_errors=True)
+        os.makedirs(self.root, exist_ok=True)
+        self._entries = OrderedDict()   # handle -> entry dict, least recently used first
+        self._lock = threading.RLock()
+
+    # --- Public API ---
+    def put(self, owner, name, obj, username=None):
+        """Stores obj for owner (e.g. a session id) and returns its handle; username is shown in usage()."""
+        handle = uuid.uuid4().hex
+        with self._lock:
+            self._entries[handle] = {
+                "owner": owner,
+                "username": username,
+                "name": name,
+                "obj": obj,
+                "nbytes": estimate_nbytes(obj),
+                "path": None,
+                "disk_bytes": 0,
+                "spilling": False,
+                "last_access": time.time(),
+            }
+            self._expire()
+            pending = self._enforce_budgets(owner)
+        self._write_spills(pending)
+        return handle
+
+    def get(self, handle):
+        """Returns the artifact for handle (reloading it from disk if spilled), or None if it is gone."""
+        with self._lock:
+            entry = self._entries.get(handle)
+            if entry is None:
+                return None
+            path = entry["path"] if entry["obj"] is None else None
+        loaded = None
+        if path is not None:
+            try:
+                with open(path, "rb") as fh:
+                    loaded = pickle.load(fh)
+            except (OSError, pickle.UnpicklingError, EOFError):
+                self.release(handle)
+                return None
+        with self._lock:
+            entry = self._entries.get(handle)
+            if entry is None:
+                # Released while it was being read
+                return None
+            if entry["obj"] is None:
+                entry["obj"] = loaded
+            obj = entry["obj"]
+            entry["last_access"] = time.time()
+            self._entries.move_to_end(handle)
+            pending = []
+            if entry["nbytes"] > self.user_budget:
+                # Too large to stay resident for its owner: hand it out, but keep only the copy on disk
+                self._mark_spill(handle, pending)
+            else:
+                pending = self._enforce_budgets(entry["owner"], keep=handle)
+        self._write_spills(pending)
+        return obj
+
+    def release(self, handle):
+        """Deletes an artifact from memory and disk."""
+        with self._lock:
+            self._remove(handle)
+
+    def release_owner(self, owner):
+        """Deletes every artifact belonging to owner."""
+        with self._lock:
+            for handle in [h for h, e in self._entries.items() if e["owner"] == owner]:
+                self._remove(handle)
+
+    def usage(self):
+        """Per-owner usage: username, artifact count, bytes in memory and bytes spilled to disk."""
+        with self._lock:
+            summary = {}
+            for entry in self._entries.values():
+                owner = summary.setdefault(entry["owner"], {"owner": entry["owner"], "username": entry["username"], "artifacts": 0, "memory_bytes": 0, "disk_bytes": 0})
+                owner["artifacts"] += 1
+                if entry["obj"] is not None:
+                    owner["memory_bytes"] += entry["nbytes"]
+                owner["disk_bytes"] += entry["disk_bytes"]
+            return list(summary.values())
+
+    def memory_bytes(self, owner=None):
+        """Bytes held in memory, excluding artifacts already on their way to disk."""
+        with self._lock:
+            return sum(e["nbytes"] for e in self._entries.values() if self._resident(e) and (owner is None or e["owner"] == owner))
+
+    # --- Internals (callers hold the lock, except _write_spills) ---
+    @staticmethod
+    def _resident(entry):
+        return entry["obj"] is not None and not entry["spilling"]
+
+    def _remove(self, handle):
+        entry = self._entries.pop(handle, None)
+        if entry and entry["path"]:
+            try:
+                os.remove(entry["path"])
+            except OSError:
+                pass
+
+    def _mark_spill(self, handle, pending):
+        """Drops an artifact from memory, or queues it on pending for _write_spills if it has no copy on disk yet."""
+        entry = self._entries[handle]
+        if entry["path"] is not None:
+            entry["obj"] = None
+        elif not entry["spilling"]:
+            # Still served from memory until its pickle is written
+            entry["spilling"] = True
+            pending.append(handle)
+
+    def _write_spills(self, handles):
+        """Pickles queued artifacts to disk without holding the lock, then drops them from memory."""
+        for handle in handles:
+            with self._lock:
+                entry = self._entries.get(handle)
+                if entry is None or not entry["spilling"]:
+                    continue
+                obj, owner = entry["obj"], entry["owner"]
+            owner_dir = os.path.join(self.root, uuid.uuid5(uuid.NAMESPACE_OID, str(owner)).hex)
+            path = os.path.join(owner_dir, f"{handle}.pkl")
+            try:
+                os.makedirs(owner_dir, exist_ok=True)
+                with open(path, "wb") as fh:
+                    pickle.dump(obj, fh, protocol=pickle.HIGHEST_PROTOCOL)
+                disk_bytes = os.path.getsize(path)
+            except Exception:
+                # Unpicklable object or disk failure: it stays in memory rather than being lost
+                with self._lock:
+                    if handle in self._entries:
+                        self._entries[handle]["spilling"] = False
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+                continue
+            with self._lock:
+                entry = self._entries.get(handle)
+                if entry is None:
+                    # Released while it was being written
+                    try:
+                        os.remove(path)
+                    except OSError:
+                        pass
+                    continue
+                entry.update(path=path, disk_bytes=disk_bytes, obj=None, spilling=False)
+
+    def _enforce_budgets(self, owner, keep=None):
+        """Marks least recently used artifacts for spilling until the budgets hold; returns those that still need writing.
+
+        The artifact being returned is never spilled ahead of the owner's
+        others, and a reload never pushes other owners' artifacts out.
+        """
+        pending = []
+        for handle, entry in list(self._entries.items()):
+            if self.memory_bytes(owner) <= self.user_budget:
+                break
+            if entry["owner"] == owner and self._resident(entry) and handle != keep:
+                self._mark_spill(handle, pending)
+        for handle, entry in list(self._entries.items()):
+            if self.memory_bytes() <= self.global_budget:
+                return pending
+            if self._resident(entry) and handle != keep and (keep is None or entry["owner"] == owner):
+                self._mark_spill(handle, pending)
+        if keep is not None and self.memory_bytes() > self.global_budget:
+            self._mark_spill(keep, pending)
+        return pending
+
+    def _expire(self):
+        cutoff = time.time() - self.ttl
+        for handle in [h for h, e in self._entries.items() if e["last_access"] < cutoff]:
+            self._remove(handle)
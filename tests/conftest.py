@@ -0,0 +1,90 @@
+import io
+import os
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+class StandInServer:
+    """Local HTTP server whose responses are set per path by the test.
+
+    A route is either a dict (status, headers, body, delay, content_length)
+    or a callable taking the request headers and returning such a dict.
+    Every request is recorded as (path, headers).
+    """
+
+    def __init__(self):
+        self.routes = {}
+        self.requests = []
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                server.requests.append((self.path, dict(self.headers)))
+                route = server.routes.get(self.path, {"status": 404, "body": b"not found", "headers": {"Content-Type": "text/plain"}})
+                if callable(route):
+                    route = route(self.headers)
+                time.sleep(route.get("delay", 0))
+                body = route.get("body", b"")
+                self.send_response(route.get("status", 200))
+                for name, value in route.get("headers", {}).items():
+                    self.send_header(name, value)
+                if route.get("content_length", True):
+                    self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                # HTTP/1.0: without Content-Length the body ends when the connection closes
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self._httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self._httpd.daemon_threads = True
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self._thread.start()
+        self.base_url = f"http://127.0.0.1:{self._httpd.server_address[1]}"
+        self.running = True
+
+    def url(self, path):
+        return self.base_url + path
+
+    def requests_for(self, path):
+        return [headers for request_path, headers in self.requests if request_path == path]
+
+    def stop(self):
+        if self.running:
+            self._httpd.shutdown()
+            self._httpd.server_close()
+            self.running = False
+
+
+@pytest.fixture
+def http_server():
+    server = StandInServer()
+    yield server
+    server.stop()
+
+
+def image_bytes(size=(800, 800), image_format="JPEG", color=(200, 40, 40)):
+    """Encoded test image of the given size."""
+    from PIL import Image
+    buffer = io.BytesIO()
+    Image.new("RGB", size, color).save(buffer, format=image_format)
+    return buffer.getvalue()
+
+
+def png_header_bytes(width, height):
+    """A PNG with a valid header declaring width x height and a token IDAT chunk (no real pixel data)."""
+    import struct
+    import zlib
+
+    def chunk(kind, data):
+        return struct.pack(">I", len(data)) + kind + data + struct.pack(">I", zlib.crc32(kind + data) & 0xFFFFFFFF)
+
+    header = struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0)
+    return b"\x89PNG\r\n\x1a\n" + chunk(b"IHDR", header) + chunk(b"IDAT", zlib.compress(b"\x00" * 64)) + chunk(b"IEND", b"")
@@ -0,0 +1,191 @@
+import base64
+import io
+import json
+import os
+import threading
+import time
+
+from PIL import Image
+
+from conftest import image_bytes, png_header_bytes
+from image_cache import ImageCache
+
+
+def make_cache(tmp_path, **kwargs):
+    return ImageCache(cache_dir=str(tmp_path / "images"), timeout=2, **kwargs)
+
+
+def test_first_fetch_downloads_and_stores_validators(tmp_path, http_server):
+    http_server.routes["/logo.png"] = {"body": image_bytes(image_format="PNG"), "headers": {"Content-Type": "image/png", "ETag": '"v1"', "Last-Modified": "Mon, 05 Oct 2026 10:00:00 GMT"}}
+    cache = make_cache(tmp_path)
+
+    path = cache.fetch(http_server.url("/logo.png"))
+
+    assert path is not None and path.endswith(".png")
+    with open(path, "rb") as fh:
+        assert fh.read() == http_server.routes["/logo.png"]["body"]
+    meta = cache._read_meta(http_server.url("/logo.png"))
+    assert meta["etag"] == '"v1"' and meta["last_modified"] == "Mon, 05 Oct 2026 10:00:00 GMT"
+    assert cache.cached_path(http_server.url("/logo.png")) == path
+
+
+def test_fresh_hit_makes_no_request(tmp_path, http_server):
+    http_server.routes["/logo.png"] = {"body": image_bytes(image_format="PNG"), "headers": {"Content-Type": "image/png"}}
+    cache = make_cache(tmp_path)
+    url = http_server.url("/logo.png")
+
+    first = cache.fetch(url)
+    second = cache.fetch(url)
+
+    assert first == second
+    assert len(http_server.requests_for("/logo.png")) == 1
+
+
+def test_stale_copy_revalidates_with_304(tmp_path, http_server):
+    body = image_bytes(image_format="PNG")
+    last_modified = "Mon, 05 Oct 2026 10:00:00 GMT"
+
+    def conditional(headers):
+        if headers.get("If-None-Match") == '"v1"':
+            return {"status": 304}
+        return {"body": body, "headers": {"Content-Type": "image/png", "ETag": '"v1"', "Last-Modified": last_modified}}
+
+    http_server.routes["/logo.png"] = conditional
+    cache = make_cache(tmp_path)
+    url = http_server.url("/logo.png")
+
+    path = cache.fetch(url)
+    assert cache.fetch(url, max_age=0) == path
+
+    revalidation = http_server.requests_for("/logo.png")[1]
+    assert revalidation["If-None-Match"] == '"v1"'
+    assert revalidation["If-Modified-Since"] == last_modified
+    with open(path, "rb") as fh:
+        assert fh.read() == body
+
+
+def test_stale_copy_served_when_server_is_down(tmp_path, http_server):
+    http_server.routes["/logo.png"] = {"body": image_bytes(image_format="PNG"), "headers": {"Content-Type": "image/png"}}
+    cache = make_cache(tmp_path)
+    url = http_server.url("/logo.png")
+    path = cache.fetch(url)
+
+    http_server.stop()
+
+    assert cache.fetch(url, max_age=0) == path
+
+
+def test_failed_url_backs_off_until_retry(tmp_path, http_server):
+    cache = make_cache(tmp_path)
+    url = http_server.url("/missing.png")
+
+    assert cache.fetch(url) is None
+    assert cache.fetch(url) is None
+    assert len(http_server.requests_for("/missing.png")) == 1
+
+    # An explicit refresh ignores the backoff
+    http_server.routes["/missing.png"] = {"body": image_bytes(image_format="PNG"), "headers": {"Content-Type": "image/png"}}
+    assert cache.fetch(url, max_age=0) is not None
+    assert not os.path.exists(cache._failure_path(url))
+
+
+def test_failure_backoff_expires(tmp_path, http_server):
+    cache = make_cache(tmp_path)
+    url = http_server.url("/flaky.png")
+    assert cache.fetch(url) is None
+
+    with open(cache._failure_path(url), "r", encoding="utf-8") as fh:
+        failure = json.load(fh)
+    failure["retry_at"] = time.time() - 1
+    with open(cache._failure_path(url), "w", encoding="utf-8") as fh:
+        json.dump(failure, fh)
+    http_server.routes["/flaky.png"] = {"body": image_bytes(image_format="PNG"), "headers": {"Content-Type": "image/png"}}
+
+    assert cache.fetch(url) is not None
+    assert len(http_server.requests_for("/flaky.png")) == 2
+
+
+def test_prefetch_deduplicates_concurrent_requests(tmp_path, http_server):
+    http_server.routes["/logo.png"] = {"body": image_bytes(image_format="PNG"), "headers": {"Content-Type": "image/png"}, "delay": 0.2}
+    http_server.routes["/other.png"] = {"body": image_bytes(image_format="PNG", color=(0, 0, 255)), "headers": {"Content-Type": "image/png"}, "delay": 0.2}
+    cache = make_cache(tmp_path)
+    url = http_server.url("/logo.png")
+    urls = [url, f"  {url}  ", url, http_server.url("/other.png"), "not a url", ""]
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(cache.prefetch(urls))) for _ in range(3)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert all(set(paths) == {url, http_server.url("/other.png")} for paths in results)
+    assert all(paths[url] is not None for paths in results)
+    assert len(http_server.requests_for("/logo.png")) == 1
+    assert len(http_server.requests_for("/other.png")) == 1
+
+
+def test_thumbnail_is_png_within_size(tmp_path, http_server):
+    http_server.routes["/photo.jpg"] = {"body": image_bytes(size=(1200, 600)), "headers": {"Content-Type": "image/jpeg"}}
+    cache = make_cache(tmp_path)
+    url = http_server.url("/photo.jpg")
+
+    path = cache.thumbnail(url, size=(128, 128))
+
+    with Image.open(path) as thumb:
+        assert thumb.format == "PNG"
+        assert thumb.size == (128, 64)
+    data_uri = cache.thumbnail_data_uris([url])[url]
+    assert data_uri.startswith("data:image/png;base64,")
+    with Image.open(io.BytesIO(base64.b64decode(data_uri.split(",", 1)[1]))) as thumb:
+        assert thumb.size == (128, 64)
+
+
+def test_decompression_bomb_thumbnail_is_skipped(tmp_path, http_server):
+    http_server.routes["/huge.png"] = {"body": png_header_bytes(20000, 20000), "headers": {"Content-Type": "image/png"}}
+    http_server.routes["/photo.jpg"] = {"body": image_bytes(), "headers": {"Content-Type": "image/jpeg"}}
+    cache = make_cache(tmp_path)
+
+    data_uris = cache.thumbnail_data_uris([http_server.url("/huge.png"), http_server.url("/photo.jpg")])
+
+    assert cache.thumbnail(http_server.url("/huge.png")) is None
+    assert list(data_uris) == [http_server.url("/photo.jpg")]
+
+
+def test_prune_drops_least_recently_used(tmp_path, http_server):
+    for name in ("a", "b", "c"):
+        http_server.routes[f"/{name}.jpg"] = {"body": os.urandom(50_000), "headers": {"Content-Type": "image/jpeg"}}
+    cache = make_cache(tmp_path, max_bytes=120_000)
+    urls = {name: http_server.url(f"/{name}.jpg") for name in ("a", "b", "c")}
+    for offset, name in enumerate(("a", "b", "c")):
+        cache.fetch(urls[name])
+        used_at = time.time() - 100 + offset
+        os.utime(cache._meta_path(urls[name]), (used_at, used_at))
+    cache.fetch(urls["a"])          # fresh hit: "a" becomes the most recently used
+
+    cache.prune()
+
+    assert cache.cached_path(urls["b"]) is None
+    assert cache.cached_path(urls["a"]) is not None
+    assert cache.cached_path(urls["c"]) is not None
+
+
+def test_non_image_response_is_not_cached(tmp_path, http_server):
+    http_server.routes["/logo.png"] = {"body": b"<html>Not found</html>", "headers": {"Content-Type": "text/html; charset=utf-8"}}
+    cache = make_cache(tmp_path)
+    url = http_server.url("/logo.png")
+
+    assert cache.fetch(url) is None
+    assert cache.cached_path(url) is None
+    assert os.path.exists(cache._failure_path(url))
+
+
+def test_oversized_download_is_abandoned(tmp_path, http_server):
+    body = os.urandom(200_000)
+    http_server.routes["/big.jpg"] = {"body": body, "headers": {"Content-Type": "image/jpeg"}}
+    http_server.routes["/big-stream.jpg"] = {"body": body, "headers": {"Content-Type": "image/jpeg"}, "content_length": False}
+    cache = make_cache(tmp_path, max_download_bytes=100_000)
+
+    assert cache.fetch(http_server.url("/big.jpg")) is None
+    assert cache.fetch(http_server.url("/big-stream.jpg")) is None
+    assert not [name for name in os.listdir(cache.cache_dir) if not name.endswith(".fail")]
@@ -0,0 +1,145 @@
+import os
+
+import pandas as pd
+
+from conftest import image_bytes, png_header_bytes
+from image_validator import ValidationCache, _header_size, validate_frame_images, validate_image_urls
+
+
+def validate(urls, **kwargs):
+    kwargs.setdefault("timeout", 2)
+    kwargs.setdefault("rate_per_host", 0)
+    return validate_image_urls(urls, **kwargs)
+
+
+def test_valid_image(http_server):
+    http_server.routes["/ok.jpg"] = {"body": image_bytes(size=(800, 600)), "headers": {"Content-Type": "image/jpeg"}}
+
+    result = validate([http_server.url("/ok.jpg")])[http_server.url("/ok.jpg")]
+
+    assert result["ok"] and result["issue"] is None
+    assert (result["width"], result["height"]) == (800, 600)
+    assert result["http_status"] == 200 and result["content_type"] == "image/jpeg"
+
+
+def test_missing_image(http_server):
+    result = validate([http_server.url("/missing.jpg")])[http_server.url("/missing.jpg")]
+
+    assert not result["ok"]
+    assert result["http_status"] == 404
+    assert result["issue"] == "Unreachable (HTTP 404)"
+
+
+def test_wrong_content_type(http_server):
+    http_server.routes["/page.html"] = {"body": b"<html></html>", "headers": {"Content-Type": "text/html; charset=utf-8"}}
+
+    result = validate([http_server.url("/page.html")])[http_server.url("/page.html")]
+
+    assert not result["ok"]
+    assert result["issue"] == "Unsupported content type 'text/html'"
+
+
+def test_undersized_image(http_server):
+    http_server.routes["/small.png"] = {"body": image_bytes(size=(300, 900), image_format="PNG"), "headers": {"Content-Type": "image/png"}}
+
+    result = validate([http_server.url("/small.png")])[http_server.url("/small.png")]
+
+    assert not result["ok"]
+    assert result["issue"].startswith("Too small (300x900 px")
+
+
+def test_oversized_image_with_content_length(http_server):
+    body = image_bytes() + os.urandom(200_000)
+    http_server.routes["/big.jpg"] = {"body": body, "headers": {"Content-Type": "image/jpeg"}}
+
+    result = validate([http_server.url("/big.jpg")], max_bytes=100_000)[http_server.url("/big.jpg")]
+
+    assert not result["ok"]
+    assert result["bytes"] == len(body)
+    assert result["issue"].startswith("File too large")
+
+
+def test_oversized_image_without_content_length(http_server):
+    body = image_bytes() + os.urandom(200_000)
+    http_server.routes["/big.jpg"] = {"body": body, "headers": {"Content-Type": "image/jpeg"}, "content_length": False}
+
+    result = validate([http_server.url("/big.jpg")], max_bytes=100_000)[http_server.url("/big.jpg")]
+
+    assert not result["ok"]
+    assert result["bytes"] > 100_000
+    assert result["issue"].startswith("File too large")
+
+
+def test_decompression_bomb_does_not_abort_batch(http_server):
+    http_server.routes["/ok.jpg"] = {"body": image_bytes(), "headers": {"Content-Type": "image/jpeg"}}
+    http_server.routes["/huge.png"] = {"body": png_header_bytes(20000, 20000), "headers": {"Content-Type": "image/png"}}
+
+    results = validate([http_server.url("/ok.jpg"), http_server.url("/huge.png")])
+
+    assert results[http_server.url("/ok.jpg")]["ok"]
+    huge = results[http_server.url("/huge.png")]
+    assert not huge["ok"]
+    assert huge["issue"] == "Too large (20000x20000 px)"
+
+
+def test_header_size_reads_png_jpeg_and_webp():
+    for image_format in ("PNG", "JPEG", "WEBP"):
+        assert _header_size(image_bytes(size=(1234, 567), image_format=image_format)) == (1234, 567)
+    assert _header_size(png_header_bytes(20000, 20000)) == (20000, 20000)
+    assert _header_size(b"GIF89a") is None
+
+
+def test_frame_reports_blank_and_non_url_required_values(http_server):
+    http_server.routes["/ok.jpg"] = {"body": image_bytes(), "headers": {"Content-Type": "image/jpeg"}}
+    df = pd.DataFrame({
+        "SKU Code*": ["A", "B", "C"],
+        "Main Image*": [http_server.url("/ok.jpg"), "", "not-a-url"],
+        "1 st Image": ["(Optional)", None, http_server.url("/ok.jpg")],
+    })
+
+    report = validate_frame_images(df, ["Main Image*", "1 st Image"], required_columns=["Main Image*"], timeout=2, rate_per_host=0)
+
+    by_url = report.set_index("Image URL")
+    assert set(by_url.index) == {http_server.url("/ok.jpg"), "", "not-a-url"}
+    assert by_url.loc["", "Issue"] == "Not a valid http(s) URL"
+    assert by_url.loc["not-a-url", "Issue"] == "Not a valid http(s) URL"
+    assert by_url.loc[http_server.url("/ok.jpg"), "Valid"]
+    assert by_url.loc[http_server.url("/ok.jpg"), "SKUs Affected"] == 2
+    assert len(http_server.requests_for("/ok.jpg")) == 1
+
+
+def test_cache_reuses_definitive_results(http_server):
+    http_server.routes["/ok.jpg"] = {"body": image_bytes(), "headers": {"Content-Type": "image/jpeg"}}
+    cache = ValidationCache()
+    urls = [http_server.url("/ok.jpg"), http_server.url("/missing.jpg")]
+
+    first = validate(urls, cache=cache)
+    second = validate(urls, cache=cache)
+
+    assert first == second
+    assert len(http_server.requests_for("/ok.jpg")) == 1
+    assert len(http_server.requests_for("/missing.jpg")) == 1
+
+
+def test_transient_failures_are_not_cached(http_server):
+    http_server.routes["/flaky.jpg"] = {"status": 503, "body": b"busy", "headers": {"Content-Type": "text/plain"}}
+    cache = ValidationCache()
+    url = http_server.url("/flaky.jpg")
+
+    assert validate([url], cache=cache)[url]["issue"] == "Unreachable (HTTP 503)"
+    http_server.routes["/flaky.jpg"] = {"body": image_bytes(), "headers": {"Content-Type": "image/jpeg"}}
+
+    assert validate([url], cache=cache)[url]["ok"]
+    assert len(http_server.requests_for("/flaky.jpg")) == 2
+
+
+def test_connection_errors_are_not_cached(http_server):
+    http_server.routes["/ok.jpg"] = {"body": image_bytes(), "headers": {"Content-Type": "image/jpeg"}}
+    url = http_server.url("/ok.jpg")
+    cache = ValidationCache()
+    http_server.stop()
+
+    result = validate([url], cache=cache)[url]
+
+    assert result["issue"].startswith("Unreachable (")
+    assert len(cache) == 0
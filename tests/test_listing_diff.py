@@ -0,0 +1,119 @@
+import pandas as pd
+
+from listing_diff import CHANGE_TYPE_COL, DELETED, INSERTED, UPDATED, diff_exports
+
+KEY = "SKU Code*"
+
+
+def by_key(delta):
+    return delta.set_index(KEY)
+
+
+def test_whitespace_padded_keys_and_values_match():
+    previous = pd.DataFrame({KEY: [" A1 ", "B2"], "Price": ["499 ", "10"]})
+    current = pd.DataFrame({KEY: ["A1", " B2"], "Price": ["499", "10"]})
+
+    delta, stats = diff_exports(previous, current)
+
+    assert delta.empty
+    assert stats["unchanged"] == 2 and stats["inserted"] == stats["deleted"] == 0
+
+
+def test_numeric_text_matches_numbers():
+    previous = pd.DataFrame({KEY: ["A1", "B2"], "Price": ["499", "10"]})
+    current = pd.DataFrame({KEY: ["A1", "B2"], "Price": [499.0, 11.0]})
+
+    delta, stats = diff_exports(previous, current)
+
+    assert list(delta[KEY]) == ["B2"]
+    assert stats["updated"] == 1 and stats["columns_changed"] == {"Price": 1}
+
+
+def test_duplicate_keys_keep_last_occurrence():
+    previous = pd.DataFrame({KEY: ["A1", "A1", "B2"], "Price": ["1", "2", "3"]})
+    current = pd.DataFrame({KEY: ["A1", "B2", "B2"], "Price": ["2", "9", "3"]})
+
+    delta, stats = diff_exports(previous, current)
+
+    assert delta.empty
+    assert stats["duplicate_keys"] == 2
+    assert stats["unchanged"] == 2
+
+
+def test_empty_previous_inserts_everything():
+    previous = pd.DataFrame({KEY: pd.Series(dtype=str), "Price": pd.Series(dtype=str)})
+    current = pd.DataFrame({KEY: ["A1", "B2"], "Price": [10, 20]})
+
+    delta, stats = diff_exports(previous, current)
+
+    assert list(delta[CHANGE_TYPE_COL]) == [INSERTED, INSERTED]
+    assert list(delta["Price"]) == [10, 20]
+    assert stats["inserted"] == 2
+
+
+def test_empty_current_deletes_everything():
+    previous = pd.DataFrame({KEY: ["A1", "B2"], "Price": ["10", "20"]})
+    current = pd.DataFrame({KEY: pd.Series(dtype=str), "Price": pd.Series(dtype=str)})
+
+    delta, stats = diff_exports(previous, current)
+
+    assert list(delta[CHANGE_TYPE_COL]) == [DELETED, DELETED]
+    assert stats["deleted"] == 2 and stats["unchanged"] == 0
+
+
+def test_added_and_removed_columns():
+    previous = pd.DataFrame({KEY: ["A1", "B2"], "Price": ["10", "20"], "Legacy Code": ["x", "y"]})
+    current = pd.DataFrame({KEY: ["A1", "C3"], "Price": ["10", "30"], "Stock": [4, 7]})
+
+    delta, stats = diff_exports(previous, current)
+
+    assert stats["added_columns"] == ["Stock"] and stats["removed_columns"] == ["Legacy Code"]
+    assert "Legacy Code" not in delta.columns
+    assert "Changed: Stock" not in delta.columns and "Changed: Price" in delta.columns
+    rows = by_key(delta)
+    assert rows.loc["C3", CHANGE_TYPE_COL] == INSERTED
+    assert rows.loc["B2", CHANGE_TYPE_COL] == DELETED
+    assert pd.isna(rows.loc["B2", "Stock"])
+
+
+def test_current_only_int_columns_keep_integer_output():
+    previous = pd.DataFrame({KEY: ["A1", "B2"], "Price": ["10", "20"]})
+    current = pd.DataFrame({KEY: ["A1", "C3"], "Price": ["11", "30"], "Stock": [4, 7]})
+
+    delta, _ = diff_exports(previous, current)
+
+    assert delta["Stock"].dtype == "Int64"
+    assert delta.to_csv(index=False).splitlines()[1:] == [
+        "C3,INSERTED,30,7,False",
+        "A1,UPDATED,11,4,True",
+        "B2,DELETED,20,,False",
+    ]
+    without_deletions, _ = diff_exports(previous.iloc[:1], current)
+    assert without_deletions["Stock"].dtype == current["Stock"].dtype
+
+
+def test_deleted_rows_carry_previous_values():
+    previous = pd.DataFrame({KEY: ["A1", "B2"], "Price": ["10", "20"], "Brand*": ["Acme", "Globex"]})
+    current = pd.DataFrame({KEY: ["A1"], "Price": ["10"], "Brand*": ["Acme"]})
+
+    delta, _ = diff_exports(previous, current)
+
+    assert len(delta) == 1
+    deleted = delta.iloc[0]
+    assert (deleted[KEY], deleted["Price"], deleted["Brand*"]) == ("B2", "20", "Globex")
+    assert deleted[CHANGE_TYPE_COL] == DELETED
+
+
+def test_change_flags_only_on_updated_rows():
+    previous = pd.DataFrame({KEY: ["A1", "B2", "D4"], "Price": ["10", "20", "40"], "Brand*": ["Acme", "Globex", "Initech"]})
+    current = pd.DataFrame({KEY: ["A1", "B2", "C3"], "Price": ["10", "25", "30"], "Brand*": ["Acme Corp", "Globex", "Umbrella"]})
+
+    delta, stats = diff_exports(previous, current)
+
+    rows = by_key(delta)
+    assert rows[CHANGE_TYPE_COL].to_dict() == {"C3": INSERTED, "A1": UPDATED, "B2": UPDATED, "D4": DELETED}
+    assert rows.loc["A1", ["Changed: Price", "Changed: Brand*"]].tolist() == [False, True]
+    assert rows.loc["B2", ["Changed: Price", "Changed: Brand*"]].tolist() == [True, False]
+    assert not rows.loc[["C3", "D4"], ["Changed: Price", "Changed: Brand*"]].to_numpy().any()
+    assert stats["columns_changed"] == {"Price": 1, "Brand*": 1}
+    assert list(delta.columns[:2]) == [KEY, CHANGE_TYPE_COL]
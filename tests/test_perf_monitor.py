@@ -0,0 +1,74 @@
+import sqlite3
+
+import pytest
+
+import perf_monitor
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    return str(tmp_path / "perf.sqlite3")
+
+
+def row_count(db_path):
+    with sqlite3.connect(db_path) as conn:
+        return conn.execute("SELECT COUNT(*) FROM stage_log").fetchone()[0]
+
+
+def test_percentile_is_nearest_rank():
+    values = list(range(1, 101))
+
+    assert perf_monitor._percentile([], 50) is None
+    assert perf_monitor._percentile([7], 95) == 7
+    assert perf_monitor._percentile(values, 50) == 50
+    assert perf_monitor._percentile(values, 95) == 95
+    assert perf_monitor._percentile(values, 100) == 100
+
+
+def test_stage_summary_groups_by_tool_and_stage(db_path):
+    for seconds, rows in ((0.1, 10), (0.2, 30), (0.4, 20)):
+        perf_monitor.record_stage("listing_maker", "expand", seconds, rows=rows, peak_rss=100.0 + rows, rss_delta=rows / 10, db_path=db_path)
+    perf_monitor.record_stage("pricing_tool", "reprice", 0.05, db_path=db_path)
+
+    summary = {(s["tool"], s["stage"]): s for s in perf_monitor.stage_summary(db_path=db_path)}
+
+    expand = summary[("listing_maker", "expand")]
+    assert expand["runs"] == 3
+    assert (expand["p50_ms"], expand["p95_ms"]) == (200.0, 400.0)
+    assert (expand["p50_rows"], expand["max_rows"]) == (20, 30)
+    assert expand["peak_rss_mb"] == 130.0
+    assert expand["p95_rss_delta_mb"] == 3.0
+    reprice = summary[("pricing_tool", "reprice")]
+    assert reprice["runs"] == 1 and reprice["max_rows"] is None and reprice["peak_rss_mb"] is None
+
+
+def test_log_is_trimmed_to_max_rows(db_path, monkeypatch):
+    monkeypatch.setattr(perf_monitor, "PERF_LOG_MAX_ROWS", 150)
+
+    for _ in range(300):
+        perf_monitor.record_stage("listing_maker", "parse", 0.01, db_path=db_path)
+
+    # Trimming runs every 100th insert, so the log never holds more than PERF_LOG_MAX_ROWS + 99 rows
+    assert row_count(db_path) == 150
+    assert perf_monitor.stage_summary(db_path=db_path)[0]["runs"] == 150
+
+
+def test_disabled_monitor_records_nothing(db_path, monkeypatch):
+    monkeypatch.setattr(perf_monitor, "_enabled", False)
+
+    with perf_monitor.track_stage("listing_maker", "parse", db_path=db_path):
+        pass
+
+    assert perf_monitor.stage_summary(db_path=db_path) == []
+
+
+def test_unreadable_log_does_not_raise(tmp_path):
+    db_path = str(tmp_path / "corrupt.sqlite3")
+    with open(db_path, "wb") as fh:
+        fh.write(b"this is not a sqlite database" * 100)
+
+    perf_monitor.record_stage("listing_maker", "parse", 0.01, db_path=db_path)
+    assert perf_monitor.save_profile("listing_maker", "report", db_path=db_path) is False
+    assert perf_monitor.stage_summary(db_path=db_path) is None
+    assert perf_monitor.recent_profiles(db_path=db_path) == []
+    assert perf_monitor.clear_log(db_path=db_path) is False
@@ -0,0 +1,47 @@
+import os
+import time
+
+import pytest
+
+from result_store import ResultStore, content_key
+
+
+def test_put_and_get_round_trip(tmp_path):
+    store = ResultStore(str(tmp_path))
+
+    key = store.put(b"payload")
+
+    assert key == content_key(b"payload")
+    assert store.has(key)
+    assert store.get(key) == b"payload"
+    assert store.get(content_key(b"other")) is None
+
+
+def test_content_key_depends_on_every_part():
+    assert content_key("task", {"a": 1}) == content_key("task", {"a": 1})
+    assert content_key("task", {"a": 1}) != content_key("task", {"a": 2})
+    # Length-prefixed parts: moving a boundary changes the key
+    assert content_key(b"ab", b"c") != content_key(b"a", b"bc")
+
+
+def test_invalid_keys_are_rejected(tmp_path):
+    store = ResultStore(str(tmp_path))
+
+    assert not store.has("../../etc/passwd")
+    with pytest.raises(ValueError):
+        store.get("../../etc/passwd")
+
+
+def test_prune_drops_least_recently_used(tmp_path):
+    store = ResultStore(str(tmp_path), max_bytes=250)
+    keys = [store.put(bytes([i]) * 100) for i in range(3)]
+    for offset, key in enumerate(keys):
+        used_at = time.time() - 100 + offset
+        os.utime(store.path(key), (used_at, used_at))
+    store.get(keys[0])          # a read makes it the most recently used
+
+    assert store.prune() == 100
+
+    assert not store.has(keys[1])
+    assert store.has(keys[0]) and store.has(keys[2])
+    assert store.size_bytes() == 200
@@ -0,0 +1,91 @@
+from session_store import ArtifactStore
+
+
+def make_store(tmp_path, **kwargs):
+    return ArtifactStore(root=str(tmp_path / "artifacts"), **kwargs)
+
+
+def test_spilled_artifact_is_reloaded(tmp_path):
+    store = make_store(tmp_path, user_budget=150, global_budget=10_000)
+    first = store.put("alice", "a", b"a" * 100)
+    store.put("alice", "b", b"b" * 100)
+
+    assert store.memory_bytes("alice") == 100
+    assert store.get(first) == b"a" * 100
+    assert store.memory_bytes("alice") == 100
+
+
+def test_reload_over_owner_budget_is_not_kept_resident(tmp_path):
+    store = make_store(tmp_path, user_budget=150, global_budget=10_000)
+    handle = store.put("alice", "huge", b"x" * 500)
+    assert store.memory_bytes("alice") == 0
+
+    assert store.get(handle) == b"x" * 500
+    assert store.memory_bytes("alice") == 0
+
+
+def test_reload_does_not_evict_other_owners(tmp_path):
+    store = make_store(tmp_path, user_budget=150, global_budget=200)
+    first = store.put("alice", "a", b"a" * 100)
+    bob = store.put("bob", "b", b"b" * 100)
+    carol = store.put("carol", "c", b"c" * 50)
+    assert store.memory_bytes("alice") == 0
+
+    assert store.get(first) == b"a" * 100
+
+    assert store.memory_bytes("bob") == 100 and store.memory_bytes("carol") == 50
+    assert store.memory_bytes() <= 200
+    assert store.get(bob) == b"b" * 100 and store.get(carol) == b"c" * 50
+
+
+class SlowPickle:
+    """Artifact whose pickling blocks until released, to observe the store while a spill is being written."""
+
+    def __init__(self, started, release, size):
+        self.started, self.release, self.size = started, release, size
+
+    def __reduce__(self):
+        self.started.set()
+        self.release.wait(5)
+        return bytes, (self.size,)
+
+
+def test_spill_is_written_outside_the_store_lock(tmp_path):
+    import threading
+
+    store = make_store(tmp_path, user_budget=150, global_budget=10_000)
+    other = store.put("bob", "b", b"b" * 100)
+    started, release = threading.Event(), threading.Event()
+    slow = SlowPickle(started, release, 100)
+    slow_handle = store.put("alice", "slow", b"")
+    store._entries[slow_handle].update(obj=slow, nbytes=100)
+
+    spiller = threading.Thread(target=store.put, args=("alice", "big", b"x" * 100))
+    spiller.start()
+    assert started.wait(5)
+
+    # While alice's artifact is being pickled, other sessions are served and it is still readable from memory
+    reads = []
+    reader = threading.Thread(target=lambda: reads.append((store.get(other), store.get(slow_handle))))
+    reader.start()
+    reader.join(2)
+    blocked = reader.is_alive()
+    release.set()
+    spiller.join(5)
+    reader.join(5)
+
+    assert not blocked
+    assert reads == [(b"b" * 100, slow)]
+    assert store.memory_bytes("alice") == 100
+    assert store.get(slow_handle) == bytes(100)
+
+
+def test_usage_reports_username_per_session(tmp_path):
+    store = make_store(tmp_path)
+    store.put("session-1", "upload", b"a" * 10, username="User")
+    store.put("session-2", "upload", b"b" * 20, username="User")
+
+    usage = {row["owner"]: row for row in store.usage()}
+
+    assert usage["session-1"]["username"] == usage["session-2"]["username"] == "User"
+    assert usage["session-1"]["memory_bytes"] == 10 and usage["session-2"]["memory_bytes"] == 20
@@ -0,0 +1,133 @@
+import os
+import pickle
+import stat
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+import pytest
+
+import worker_service
+from benchmarks.synthetic_data import make_listing_frame
+from conftest import image_bytes
+from result_store import ResultStore
+from worker_service import WorkerError, WorkerServer, load_authkey, run_task
+
+
+@pytest.fixture(autouse=True)
+def no_authkey_env(monkeypatch):
+    monkeypatch.setattr(worker_service, "WORKER_AUTHKEY", None)
+
+
+@pytest.fixture
+def thread_pool_server(tmp_path, monkeypatch):
+    """WorkerServer whose pool runs tasks on threads, so tests can register their own tasks."""
+    monkeypatch.setattr(WorkerServer, "_new_pool", lambda self: ThreadPoolExecutor(max_workers=4))
+    server = WorkerServer(str(tmp_path / "worker.sock"), processes=2, store_root=str(tmp_path / "store"))
+    yield server
+    server.pool.shutdown(cancel_futures=True)
+
+
+class ExitOnLoad:
+    """Unpickling this ends the process, like a pool process killed for running out of memory."""
+
+    def __reduce__(self):
+        return os._exit, (1,)
+
+
+def test_key_file_is_created_private_and_shared(tmp_path):
+    key = load_authkey(str(tmp_path), create=True)
+
+    path = tmp_path / worker_service.AUTHKEY_FILE
+    assert stat.S_IMODE(os.stat(path).st_mode) == 0o600
+    assert len(key) == 64
+    assert load_authkey(str(tmp_path)) == key
+
+
+def test_key_file_readable_by_others_is_refused(tmp_path):
+    load_authkey(str(tmp_path), create=True)
+    os.chmod(tmp_path / worker_service.AUTHKEY_FILE, 0o644)
+
+    with pytest.raises(WorkerError, match="chmod 600"):
+        load_authkey(str(tmp_path))
+
+
+def test_client_without_key_file_is_refused(tmp_path):
+    with pytest.raises(WorkerError, match="No worker key"):
+        load_authkey(str(tmp_path))
+
+
+def test_stored_result_is_returned_without_contacting_the_service(tmp_path):
+    store = ResultStore(str(tmp_path))
+    input_key = store.put(b"input")
+    store.put(b"result", key=worker_service.task_key("optimize_image", {"quality": 85}, input_key))
+
+    # No key file and no service at this address: only the store can answer
+    result = run_task("optimize_image", {"quality": 85}, b"input", address=str(tmp_path / "missing.sock"), store=store)
+
+    assert result == (b"result", True)
+
+
+def test_identical_inflight_requests_share_one_job(thread_pool_server, monkeypatch):
+    calls = []
+
+    def slow_task(data):
+        calls.append(data)
+        time.sleep(0.3)
+        return data.upper()
+
+    monkeypatch.setitem(worker_service.TASKS, "slow", slow_task)
+    request = {"task": "slow", "params": {}, "input_key": thread_pool_server.store.put(b"abc")}
+    replies = []
+    threads = [threading.Thread(target=lambda: replies.append(thread_pool_server._handle(request))) for _ in range(3)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert calls == [b"abc"]
+    assert [reply["status"] for reply in replies] == ["ok"] * 3
+    assert thread_pool_server.store.get(replies[0]["result_key"]) == b"ABC"
+    assert thread_pool_server._handle(request)["cached"] is True
+
+
+def test_run_task_through_the_socket(thread_pool_server, tmp_path):
+    threading.Thread(target=thread_pool_server.serve_forever, daemon=True).start()
+    address = str(tmp_path / "worker.sock")
+    deadline = time.time() + 5
+    while not worker_service.ping(address, store_root=thread_pool_server.store.root):
+        assert time.time() < deadline
+        time.sleep(0.05)
+    store = ResultStore(thread_pool_server.store.root)
+    df = make_listing_frame(5)
+    listing = pickle.dumps(df)
+
+    result, cached = run_task("listing_transform", {}, listing, address=address, store=store)
+
+    assert cached is False
+    assert len(pickle.loads(result)) > len(df)
+    assert run_task("listing_transform", {}, listing, address=address, store=store)[1] is True
+
+
+def test_broken_pool_is_replaced_and_reported(tmp_path):
+    server = WorkerServer(str(tmp_path / "worker.sock"), processes=1, store_root=str(tmp_path / "store"))
+    try:
+        crash = {"task": "listing_transform", "params": {}, "input_key": server.store.put(pickle.dumps(ExitOnLoad()))}
+
+        reply = server._handle(crash)
+
+        assert reply["status"] == "error" and "died" in reply["error"]
+        assert server.pool_restarts == 1
+        ping = server._handle({"task": "ping"})
+        assert ping == {"status": "ok", "processes": 1, "pool_restarts": 1}
+
+        # A process that dies while the pool is idle is noticed and replaced by the next ping
+        with pytest.raises(BrokenProcessPool):
+            server.pool.submit(os._exit, 1).result(timeout=30)
+        assert server._handle({"task": "ping"})["pool_restarts"] == 2
+        ok = server._handle({"task": "optimize_image", "params": {"max_width": 100, "quality": 80}, "input_key": server.store.put(image_bytes(size=(200, 100)))})
+        assert ok["status"] == "ok"
+    finally:
+        server.pool.shutdown(cancel_futures=True)
+
@@ -0,0 +1,62 @@
+from download_output import SpooledOutput
+
+# =========================================================================
+# CPU-HEAVY TRANSFORMS (Streamlit-free, so worker processes can import them)
+# =========================================================================
+SIZE_COL = 'Variations (comma separated)*'
+SKU_COL = 'SKU Code*'
+GROUP_COL = 'Group Name*'
+COLOR_COL = 'Product Color*'
+DESC_COL = 'Product Description*'
+
+
+def generate_description_mock(row):
+    import pandas as pd
+    title = row.get('Product Name*')
+    category = row.get('Product Category*')
+    color = row.get('Product Color*')
+    fabric = row.get('Fabric Type*', 'premium material')
+    brand = row.get('Brand*', 'a trusted source')
+    sizes = row.get('Variations (comma separated)*', 'various sizes').replace(',', ', ')
+    if pd.isna(title) or pd.isna(category): return "No comprehensive description generated due to missing product name or category."
+    description = (f"Elevate your wardrobe with this exquisite {category} from {brand}. Crafted from ultra-soft {fabric}, this piece guarantees all-day COMFORT and a premium feel. The stunning {color} shade offers a versatile, MODERN look, effortlessly transitioning from casual outings to relaxed evening wear. Designed for a comfortable FIT, it provides ease of movement while maintaining a sharp silhouette. Available in sizes {sizes}, finding your PERFECT match is simple. Invest in quality and style that lasts, ensuring you look and feel your best every time you wear it. A must-have staple for your collection. (Keywords: {title.replace(' ', ', ').replace('-', ',')}, {category}, {fabric}, {color})")
+    MAX_CHARS = 1400
+    if len(description) > MAX_CHARS: description = description[:MAX_CHARS - 3] + '...'
+    return description
+
+
+def fill_missing_descriptions(df):
+    """Generates a description for every row whose 'Product Description*' is blank."""
+    import pandas as pd
+    df[DESC_COL] = df.apply(lambda row: generate_description_mock(row) if pd.isna(row[DESC_COL]) or str(row[DESC_COL]).strip() == "" else row[DESC_COL], axis=1)
+    return df
+
+
+def expand_variations(df):
+    """Explodes the comma-separated variations into one SKU row per size, sorted by group."""
+    df[SIZE_COL] = df[SIZE_COL].fillna('').astype(str).str.replace(' ', '').str.upper().str.split(','); df = df[df[SIZE_COL].apply(lambda x: len(x) > 0 and x != [''])]
+    df_expanded = df.explode(SIZE_COL, ignore_index=True); df_expanded.rename(columns={SIZE_COL: 'Size'}, inplace=True)
+    cleaned_color = df_expanded[COLOR_COL].astype(str).str.replace(' ', '').str.upper()
+    df_expanded['New SKU'] = (df_expanded[SKU_COL].astype(str) + '--' + cleaned_color + '--' + df_expanded['Size'].astype(str))
+    df_expanded.drop(columns=[SKU_COL], inplace=True); df_expanded.rename(columns={'New SKU': SKU_COL}, inplace=True)
+    df_sorted = df_expanded.sort_values(by=GROUP_COL, ascending=True); cols = list(df_sorted.columns)
+    if 'Size' in cols: cols.insert(1, cols.pop(cols.index('Size')));
+    if COLOR_COL in cols: cols.insert(2, cols.pop(cols.index(COLOR_COL)))
+    if SKU_COL in cols: cols.insert(0, cols.pop(cols.index(SKU_COL)))
+    return df_expanded[cols]
+
+
+def optimize_image(image, max_width, quality):
+    """Downscales an image to max_width and encodes it as JPEG; returns (optimized image, spooled JPEG output)."""
+    if image.width > max_width:
+        ratio = max_width / image.width
+        new_height = int(image.height * ratio)
+        optimized_image = image.resize((max_width, new_height))
+    else:
+        optimized_image = image
+    if optimized_image.mode not in ("RGB", "L"):
+        optimized_image = optimized_image.convert("RGB")
+    jpeg_output = SpooledOutput()
+    optimized_image.save(jpeg_output, format="JPEG", quality=quality)
+    jpeg_output.seek(0)
+    return optimized_image, jpeg_output
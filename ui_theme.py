@@ -0,0 +1,258 @@
+"""Aurora admin panel theme: colours plus the static CSS/HTML, built once per process.
+
+Streamlit re-executes main_app.py on every rerun, so markup that never changes
+lives in this imported module instead of being re-formatted on each run.
+"""
+
+# =========================================================================
+# AURORA ADMIN PANEL COLOR DEFINITIONS
+# =========================================================================
+# Aurora Inspired Colors
+AURORA_SIDEBAR_BG = "#060C1C"  
+AURORA_MAIN_BG = "#F8F9FA"    
+AURORA_ACCENT_BLUE = "#0272B4"      
+AURORA_ACCENT_HOVER = "#0A439F"     
+AURORA_CARD_BG = "#FFFFFF"
+AURORA_PRIMARY_TEXT = "#343A40"
+AURORA_SECONDARY_TEXT = "#6C757D"
+AURORA_BORDER_RADIUS = "10px"
+# A modern, soft shadow used across all cards and containers
+AURORA_SOFT_SHADOW = "0 4px 12px rgba(0, 0, 0, 0.05), 0 0 20px rgba(0, 0, 0, 0.02)"
+AURORA_TRANSITION = "all 0.3s ease" 
+
+
+# =========================================================================
+# PRECOMPUTED CSS AND STATIC HTML
+# =========================================================================
+# Custom CSS for the Aurora Admin Panel look and feel, using simplified selectors.
+CUSTOM_CSS = f"""
+    <style>
+    /* Import Poppins Font (Requires internet access to load) */
+    @import url('https://fonts.googleapis.com/css2?family=Poppins:wght@300;400;500;600;700&display=swap');
+
+    /* Global Styling */
+    .stApp {{
+        background-color: {AURORA_MAIN_BG};
+        color: {AURORA_PRIMARY_TEXT};
+        font-family: 'Poppins', sans-serif;
+    }}
+    
+    /* Sidebar Styling */
+    /* Target the overall sidebar container and background */
+    [data-testid="stSidebar"] {{
+        background-color: {AURORA_SIDEBAR_BG};
+        color: {AURORA_CARD_BG};
+    }}
+    /* Ensure sidebar text is visible */
+    [data-testid="stSidebar"] .stMarkdown p, 
+    [data-testid="stSidebar"] .stMarkdown h2 {{
+        color: {AURORA_CARD_BG} !important;
+    }}
+
+    /* --- Sidebar Radio Button Styling (Navigation Links) --- */
+    /* Target the label wrapper for all options */
+    [data-testid="stSidebar"] .stRadio > label {{
+        padding: 10px 15px; 
+        margin: 3px 0;
+        border-radius: {AURORA_BORDER_RADIUS}; 
+        color: {AURORA_SECONDARY_TEXT}; 
+        font-weight: 500;
+        transition: {AURORA_TRANSITION};
+        border-left: 3px solid transparent; 
+    }}
+    /* Hover state */
+    [data-testid="stSidebar"] .stRadio > label:hover {{
+        background-color: rgba(255, 255, 255, 0.05);
+        color: {AURORA_CARD_BG};
+        border-left: 3px solid {AURORA_ACCENT_BLUE};
+    }}
+    /* Active/Checked state - Targeting the Streamlit-generated div next to the radio input */
+    [data-testid="stSidebar"] .stRadio input[type="radio"]:checked + div {{
+        background-color: rgba(255, 255, 255, 0.1) !important; 
+        color: {AURORA_ACCENT_BLUE} !important; 
+        font-weight: 600;
+        border-left: 5px solid {AURORA_ACCENT_BLUE} !important; 
+    }}
+
+    /* Hide the radio button dot in the sidebar */
+    [data-testid="stSidebar"] .stRadio > label > div:first-child {{
+        display: none !important;
+    }}
+
+    /* --- Main Content Container (Floating Cards/Blocks) --- */
+    /* Target Streamlit's main content block containers for the white card look */
+    .stAlert, .stMarkdown, .stTable, .stDataFrame, .stExpander, 
+    [data-testid*="stVerticalBlock"], 
+    [data-testid*="stHorizontalBlock"],
+    [data-testid*="stContainer"]
+    {{
+        border-radius: {AURORA_BORDER_RADIUS}; 
+        box-shadow: {AURORA_SOFT_SHADOW}; 
+        padding: 1rem;
+        background-color: {AURORA_CARD_BG};
+        border: none;
+        margin-bottom: 20px;
+    }}
+    
+    /* Ensure the top-level block container is transparent and doesn't cast a shadow */
+    .stApp .block-container {{
+        padding-top: 2rem;
+        padding-bottom: 2rem;
+        padding-left: 1rem;
+        padding-right: 1rem;
+        box-shadow: none !important; 
+        background-color: {AURORA_MAIN_BG} !important; 
+    }}
+
+    /* --- Input Fields (Simplified) --- */
+    .stTextInput>div>div>input, .stSelectbox>div>div>div, 
+    .stTextArea>div>div>textarea, .stFileUploader>div>div,
+    .stDateInput>div>div>div {{
+        border-radius: {AURORA_BORDER_RADIUS};
+        border: 1px solid #dee2e6;
+        box-shadow: none;
+        transition: {AURORA_TRANSITION};
+        /* Override card background if applied by general selector */
+        background-color: white; 
+    }}
+
+    /* --- KPI Card Container Styling (Buttons) --- */
+    .stApp .stButton>button {{
+        background-color: {AURORA_CARD_BG}; 
+        color: {AURORA_PRIMARY_TEXT};
+        border: none; 
+        padding: 0; 
+        height: 120px; 
+        border-radius: {AURORA_BORDER_RADIUS}; 
+        box-shadow: {AURORA_SOFT_SHADOW}; 
+        transition: {AURORA_TRANSITION};
+        display: block; 
+        text-align: left; 
+        line-height: 1.2;
+        overflow: hidden;
+    }}
+    
+    /* KPI Card Hover Effect */
+    .stApp .stButton>button:hover {{
+        transform: translateY(-3px); 
+        box-shadow: 0 6px 18px rgba(0, 0, 0, 0.1), 0 0 25px rgba(0, 0, 0, 0.05);
+        background-color: {AURORA_CARD_BG}; 
+        border-top: 3px solid {AURORA_ACCENT_BLUE};
+    }}
+    
+    /* Primary Button Style (for actions) */
+    .stApp .stButton button[data-testid*="primaryButton"] {{
+        background-color: {AURORA_ACCENT_BLUE}; 
+        color: {AURORA_CARD_BG}; 
+        border: none; 
+        padding: 10px 20px; 
+        box-shadow: none;
+        height: auto;
+        transform: none; 
+        border-radius: 8px; 
+        display: inline-flex;
+        transition: {AURORA_TRANSITION};
+        font-weight: 500;
+    }}
+    .stApp .stButton button[data-testid*="primaryButton"]:hover {{
+        background-color: {AURORA_ACCENT_HOVER};
+        box-shadow: none;
+        transform: translateY(-1px);
+    }}
+
+    /* Custom CSS for KPI Card Inner Content (for HTML) */
+    .kpi-container {{
+        display: flex;
+        justify-content: space-between;
+        align-items: center;
+        padding: 10px 15px 5px 15px;
+    }}
+    .kpi-metric-title {{
+        font-size: 0.8em;
+        color: {AURORA_SECONDARY_TEXT};
+        font-weight: 500;
+        margin-bottom: 5px;
+    }}
+    .kpi-metric-number {{
+        font-size: 1.8em;
+        font-weight: 700;
+        line-height: 1;
+        color: {AURORA_PRIMARY_TEXT};
+    }}
+    .kpi-icon-area {{
+        font-size: 1.5em;
+        color: {AURORA_CARD_BG};
+        border-radius: 50%;
+        width: 40px;
+        height: 40px;
+        display: flex;
+        align-items: center;
+        justify-content: center;
+        box-shadow: 0 2px 5px rgba(0, 0, 0, 0.1);
+    }}
+    .kpi-footer {{
+        display: flex;
+        align-items: center;
+        padding: 5px 15px 10px 15px;
+        font-size: 0.8em;
+    }}
+    .kpi-trend {{
+        font-weight: 600;
+        margin-right: 10px;
+    }}
+    /* Top Banner Placeholder */
+    .top-banner {{
+        background-color: {AURORA_CARD_BG};
+        border-radius: {AURORA_BORDER_RADIUS};
+        box-shadow: {AURORA_SOFT_SHADOW};
+        padding: 20px 25px;
+        margin-bottom: 30px;
+        border-top: 3px solid {AURORA_ACCENT_BLUE};
+    }}
+    </style>
+    """
+
+# Required footer credit only.
+FOOTER_HTML = f"""
+    <div class="footer">
+        <p style="margin: 20px 0 0 0; font-size: 0.75em; color: {AURORA_SECONDARY_TEXT}; text-align: center;">
+            Made in Bharat | &copy; 2025 - Formula Man. All rights reserved.
+        </p>
+    </div>
+    """
+
+# Dashboard top-row KPI cards (simulating the top row of cards on Aurora dashboard).
+KPI_CARDS_HTML = [
+    # Metric 1: New Listings
+    f"""
+        <div style='background-color:{AURORA_CARD_BG}; border-radius:{AURORA_BORDER_RADIUS}; padding:20px; box-shadow:{AURORA_SOFT_SHADOW}; height:100%; border-left: 5px solid #00BCD4;'>
+            <p style='font-size:0.8em; color:{AURORA_SECONDARY_TEXT}; margin-bottom:0;'>Total Listings (YTD)</p>
+            <h3 style='margin-top:5px; color:{AURORA_PRIMARY_TEXT}; font-weight:600;'>10,500</h3>
+            <span style='font-size:0.8em; color:#4CAF50;'>▲ 15%</span> <span style='font-size:0.7em; color:{AURORA_SECONDARY_TEXT};'>vs last year</span>
+        </div>
+        """,
+    # Metric 2: Revenue
+    f"""
+        <div style='background-color:{AURORA_CARD_BG}; border-radius:{AURORA_BORDER_RADIUS}; padding:20px; box-shadow:{AURORA_SOFT_SHADOW}; height:100%; border-left: 5px solid #4CAF50;'>
+            <p style='font-size:0.8em; color:{AURORA_SECONDARY_TEXT}; margin-bottom:0;'>Revenue (MTD)</p>
+            <h3 style='margin-top:5px; color:{AURORA_PRIMARY_TEXT}; font-weight:600;'>₹12.5 Lac</h3>
+            <span style='font-size:0.8em; color:#F44336;'>▼ 3.2%</span> <span style='font-size:0.7em; color:{AURORA_SECONDARY_TEXT};'>vs last month</span>
+        </div>
+        """,
+    # Metric 3: Active SKUs
+    f"""
+        <div style='background-color:{AURORA_CARD_BG}; border-radius:{AURORA_BORDER_RADIUS}; padding:20px; box-shadow:{AURORA_SOFT_SHADOW}; height:100%; border-left: 5px solid #FFC107;'>
+            <p style='font-size:0.8em; color:{AURORA_SECONDARY_TEXT}; margin-bottom:0;'>Active SKU Count</p>
+            <h3 style='margin-top:5px; color:{AURORA_PRIMARY_TEXT}; font-weight:600;'>5,280</h3>
+            <span style='font-size:0.8em; color:#4CAF50;'>▲ 0.8%</span> <span style='font-size:0.7em; color:{AURORA_SECONDARY_TEXT};'>last 7 days</span>
+        </div>
+        """,
+    # Metric 4: Inventory Value
+    f"""
+        <div style='background-color:{AURORA_CARD_BG}; border-radius:{AURORA_BORDER_RADIUS}; padding:20px; box-shadow:{AURORA_SOFT_SHADOW}; height:100%; border-left: 5px solid {AURORA_ACCENT_BLUE};'>
+            <p style='font-size:0.8em; color:{AURORA_SECONDARY_TEXT}; margin-bottom:0;'>Inventory Value</p>
+            <h3 style='margin-top:5px; color:{AURORA_PRIMARY_TEXT}; font-weight:600;'>₹2.1 Crore</h3>
+            <span style='font-size:0.8em; color:#4CAF50;'>▲ 7%</span> <span style='font-size:0.7em; color:{AURORA_SECONDARY_TEXT};'>since Q3 audit</span>
+        </div>
+        """,
+]
@@ -0,0 +1,340 @@
+"""Local worker service that runs the CPU-heavy transforms in a process pool.
+
+Start one per host and point every Streamlit replica at it:
+
+    python worker_service.py --address 127.0.0.1:6100 --processes 4
+    ECOM_WORKER_ADDRESS=127.0.0.1:6100 streamlit run main_app.py
+
+Requests and replies are small messages over a multiprocessing.connection
+socket (TCP "host:port" or a Unix socket path); inputs and outputs travel
+through the shared ResultStore, so a result computed for one replica is
+reused by all the others. Without ECOM_WORKER_ADDRESS the app runs the
+transforms in-process as before.
+
+Messages are pickled, so the socket is authenticated with a shared key:
+ECOM_WORKER_AUTHKEY if set, otherwise a random key the service writes to
+worker.key (mode 0600) in the store directory on first start and every
+client reads from there.
+"""
+import argparse
+import importlib
+import io
+import multiprocessing
+import os
+import pickle
+import secrets
+import signal
+import stat
+import sys
+import threading
+from concurrent.futures import ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from multiprocessing.connection import Client, Listener
+
+from result_store import RESULT_STORE_DIR, ResultStore, content_key
+
+# =========================================================================
+# CONFIGURATION
+# =========================================================================
+WORKER_ADDRESS = os.environ.get("ECOM_WORKER_ADDRESS")    # unset: transforms run inside the Streamlit process
+WORKER_AUTHKEY = os.environ.get("ECOM_WORKER_AUTHKEY")  # unset: use the key file in the store directory
+AUTHKEY_FILE = "worker.key"
+WORKER_PROCESSES = int(os.environ.get("ECOM_WORKER_PROCESSES", os.cpu_count() or 2))
+WORKER_TIMEOUT = float(os.environ.get("ECOM_WORKER_TIMEOUT", 600))
+# Bump when a transform's output changes, so results stored by older code are not reused
+TASK_VERSION = 1
+
+
+class WorkerError(RuntimeError):
+    """A task failed in the worker service or the service could not be reached."""
+
+
+def parse_address(value):
+    """'host:port' becomes a TCP address; anything else is a Unix socket path."""
+    host, sep, port = value.rpartition(":")
+    if sep and port.isdigit():
+        return (host or "127.0.0.1", int(port))
+    return value
+
+
+def worker_configured():
+    return bool(WORKER_ADDRESS)
+
+
+def load_authkey(store_root=RESULT_STORE_DIR, create=False):
+    """Key authenticating the worker socket: ECOM_WORKER_AUTHKEY, else the key file in store_root.
+
+    With create=True (the service) a missing key file is generated. A key
+    file readable by other users is refused, since anyone holding the key
+    can make the service unpickle arbitrary data.
+    """
+    if WORKER_AUTHKEY:
+        return WORKER_AUTHKEY.encode("utf-8")
+    path = os.path.join(store_root, AUTHKEY_FILE)
+    if create and not os.path.exists(path):
+        os.makedirs(store_root, exist_ok=True)
+        try:
+            fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+        except FileExistsError:
+            pass                    # another service created it first
+        else:
+            with os.fdopen(fd, "w", encoding="utf-8") as fh:
+                fh.write(secrets.token_hex(32))
+    try:
+        if os.stat(path).st_mode & (stat.S_IRWXG | stat.S_IRWXO):
+            raise WorkerError(f"Worker key file {path} must be readable by its owner only (chmod 600).")
+        with open(path, "r", encoding="utf-8") as fh:
+            key = fh.read().strip()
+    except OSError as e:
+        raise WorkerError(f"No worker key: set ECOM_WORKER_AUTHKEY or start worker_service.py with this store ({e}).") from e
+    if not key:
+        raise WorkerError(f"Worker key file {path} is empty.")
+    return key.encode("utf-8")
+
+
+# =========================================================================
+# TASKS (Run inside pool processes; bytes in, bytes out)
+# =========================================================================
+def _listing_transform(data):
+    from transforms import expand_variations, fill_missing_descriptions
+    df = pickle.loads(data)
+    return pickle.dumps(expand_variations(fill_missing_descriptions(df)), protocol=pickle.HIGHEST_PROTOCOL)
+
+
+def _optimize_image(data, max_width, quality):
+    from PIL import Image
+    from transforms import optimize_image
+    with Image.open(io.BytesIO(data)) as image:
+        optimized_image, jpeg_output = optimize_image(image, max_width, quality)
+        optimized_image.close()
+        with jpeg_output:
+            return jpeg_output.read()
+
+
+def _warm_up():
+    """Imports the task dependencies, so the first real task in each pool process does not pay for them."""
+    for module in ("pandas", "PIL.Image", "transforms"):
+        importlib.import_module(module)
+
+
+def _noop():
+    pass
+
+
+TASKS = {
+    "listing_transform": _listing_transform,
+    "optimize_image": _optimize_image,
+}
+
+
+def task_key(task, params, input_key):
+    """Result key: the same task, parameters and input content always map to the same stored result."""
+    return content_key("task", task, TASK_VERSION, params, input_key)
+
+
+_pool_stores = {}
+
+
+def execute_task(task, params, input_key, result_key, store_root):
+    """Runs one task in a pool process, reading its input from and writing its result to the store."""
+    # One store per pool process, so its prune throttle survives across tasks
+    store = _pool_stores.get(store_root)
+    if store is None:
+        store = _pool_stores[store_root] = ResultStore(store_root)
+    if store.has(result_key):
+        return result_key
+    data = store.get(input_key)
+    if data is None:
+        raise WorkerError(f"Input {input_key} is missing from the result store.")
+    store.put(TASKS[task](data, **params), key=result_key)
+    return result_key
+
+
+# =========================================================================
+# SERVER
+# =========================================================================
+class WorkerServer:
+    """Accepts task requests on a local socket and runs them in a process pool.
+
+    Each connection is served by its own thread; identical requests that
+    arrive while the first is still running share one pool job. If a pool
+    process dies (e.g. killed for running out of memory), the requests it
+    breaks get an error reply and the pool is replaced.
+    """
+
+    def __init__(self, address, processes=WORKER_PROCESSES, store_root=RESULT_STORE_DIR, authkey=None):
+        self.address = parse_address(address)
+        self.processes = processes
+        self.store = ResultStore(store_root)
+        self.authkey = authkey or load_authkey(self.store.root, create=True)
+        self.pool_restarts = 0
+        self._inflight = {}
+        # Re-entrant: a future that is already done runs its _forget callback while the lock is held
+        self._lock = threading.RLock()
+        self.pool = self._new_pool()
+        self._warm_ups = [self.pool.submit(_warm_up) for _ in range(processes)]
+
+    def _new_pool(self):
+        # spawn: the server is multi-threaded, so forking it could copy held locks into children
+        return ProcessPoolExecutor(max_workers=self.processes, mp_context=multiprocessing.get_context("spawn"))
+
+    def _replace_pool(self, broken):
+        """Swaps in a fresh pool for one that a dead process has broken (once, however many requests noticed)."""
+        with self._lock:
+            if self.pool is not broken:
+                return
+            broken.shutdown(wait=False, cancel_futures=True)
+            self.pool = self._new_pool()
+            self.pool_restarts += 1
+            for _ in range(self.processes):
+                self.pool.submit(_warm_up)
+            print(f"Worker pool broke and was restarted ({self.pool_restarts} restarts so far)", flush=True)
+
+    def serve_forever(self):
+        # Start answering only once the pool processes have imported their dependencies
+        wait(self._warm_ups)
+        if isinstance(self.address, str) and os.path.exists(self.address):
+            os.remove(self.address)
+        with Listener(self.address, authkey=self.authkey) as listener:
+            print(f"Worker service listening on {listener.address} ({self.processes} processes, store {self.store.root})", flush=True)
+            while True:
+                try:
+                    conn = listener.accept()
+                except (OSError, EOFError, multiprocessing.AuthenticationError):
+                    continue
+                threading.Thread(target=self._serve_connection, args=(conn,), daemon=True).start()
+
+    def _serve_connection(self, conn):
+        with conn:
+            while True:
+                try:
+                    request = conn.recv()
+                except (EOFError, OSError):
+                    return
+                try:
+                    conn.send(self._handle(request))
+                except (OSError, ValueError):
+                    # Client gave up (timeout) or closed the connection
+                    return
+
+    def _handle(self, request):
+        task, params, input_key = request.get("task"), request.get("params", {}), request.get("input_key")
+        if task == "ping":
+            return self._pool_status()
+        if task not in TASKS:
+            return {"status": "error", "error": f"Unknown task: {task}"}
+        if not isinstance(input_key, str) or not self.store.has(input_key):
+            return {"status": "error", "error": "Task input is missing from the result store."}
+        result_key = task_key(task, params, input_key)
+        if self.store.has(result_key):
+            return {"status": "ok", "result_key": result_key, "cached": True}
+        with self._lock:
+            inflight = self._inflight.get(result_key)
+            if inflight is None:
+                pool = self.pool
+                try:
+                    future = pool.submit(execute_task, task, params, input_key, result_key, self.store.root)
+                except BrokenProcessPool:
+                    self._replace_pool(pool)
+                    return {"status": "error", "error": "Worker pool was broken and has been restarted; retry the task."}
+                inflight = self._inflight[result_key] = (future, pool)
+                future.add_done_callback(lambda _, key=result_key: self._forget(key))
+        future, pool = inflight
+        try:
+            future.result()
+        except BrokenProcessPool:
+            self._replace_pool(pool)
+            return {"status": "error", "error": "A worker process died while running the task (out of memory?); the pool has been restarted."}
+        except Exception as e:
+            return {"status": "error", "error": f"{type(e).__name__}: {e}"}
+        return {"status": "ok", "result_key": result_key, "cached": False}
+
+    def _pool_status(self):
+        """Ping reply; submitting a no-op is how a broken pool shows itself, and it is replaced on the spot."""
+        pool = self.pool
+        try:
+            pool.submit(_noop)
+        except BrokenProcessPool:
+            self._replace_pool(pool)
+            try:
+                self.pool.submit(_noop)
+            except BrokenProcessPool:
+                return {"status": "error", "error": "Worker pool is broken and could not be restarted."}
+        return {"status": "ok", "processes": self.processes, "pool_restarts": self.pool_restarts}
+
+    def _forget(self, result_key):
+        with self._lock:
+            self._inflight.pop(result_key, None)
+
+
+# =========================================================================
+# CLIENT
+# =========================================================================
+def run_task(task, params, data, address=None, store=None, timeout=WORKER_TIMEOUT):
+    """Runs task on input bytes through the worker service and returns (result bytes, cached).
+
+    A result already in the shared store is returned without contacting the
+    service. Raises WorkerError if the service fails or cannot be reached.
+    """
+    store = store or ResultStore()
+    input_key = store.put(data)
+    result_key = task_key(task, params, input_key)
+    result = store.get(result_key)
+    if result is not None:
+        return result, True
+    authkey = load_authkey(store.root)
+    try:
+        with Client(parse_address(address or WORKER_ADDRESS), authkey=authkey) as conn:
+            conn.send({"task": task, "params": params, "input_key": input_key})
+            if not conn.poll(timeout):
+                raise WorkerError(f"Worker service did not answer within {timeout:.0f}s.")
+            reply = conn.recv()
+    except (OSError, EOFError, multiprocessing.AuthenticationError) as e:
+        raise WorkerError(f"Worker service unavailable: {e}") from e
+    if reply.get("status") != "ok":
+        raise WorkerError(reply.get("error", "Unknown worker error"))
+    result = store.get(reply["result_key"])
+    if result is None:
+        raise WorkerError("Result was evicted from the store before it could be read.")
+    return result, reply.get("cached", False)
+
+
+def service_status(address=None, timeout=2, store_root=RESULT_STORE_DIR):
+    """The worker service's ping reply (status, processes, pool_restarts), or None if it does not answer."""
+    try:
+        with Client(parse_address(address or WORKER_ADDRESS), authkey=load_authkey(store_root)) as conn:
+            conn.send({"task": "ping"})
+            return conn.recv() if conn.poll(timeout) else None
+    except (OSError, EOFError, multiprocessing.AuthenticationError, WorkerError):
+        return None
+
+
+def ping(address=None, timeout=2, store_root=RESULT_STORE_DIR):
+    """True if the worker service answers at address (default: ECOM_WORKER_ADDRESS) with a working pool."""
+    status = service_status(address, timeout, store_root)
+    return status is not None and status.get("status") == "ok"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--address", default=WORKER_ADDRESS or "127.0.0.1:6100", help="'host:port' or a Unix socket path (default: $ECOM_WORKER_ADDRESS or 127.0.0.1:6100)")
+    parser.add_argument("--processes", type=int, default=WORKER_PROCESSES, help="pool size (default: $ECOM_WORKER_PROCESSES or CPU count)")
+    parser.add_argument("--store", default=RESULT_STORE_DIR, help="shared result store directory (default: $ECOM_RESULT_STORE_DIR)")
+    args = parser.parse_args(argv)
+    try:
+        server = WorkerServer(args.address, processes=args.processes, store_root=args.store)
+    except WorkerError as e:
+        parser.error(str(e))
+    # Exit through the finally below on SIGTERM too, so the pool processes are shut down with the service
+    signal.signal(signal.SIGTERM, lambda *_: sys.exit(0))
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.pool.shutdown(cancel_futures=True)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())